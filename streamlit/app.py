@@ -24,34 +24,35 @@ st.markdown(get_custom_css(), unsafe_allow_html=True)
 initialize_session_state()
 
 
+# Step routing table (step 0 is rendered without the optional details modal)
+_STEP_ROUTES = {
+    0.5: step_existing_content_selection,
+    1: step_project_setup,
+    2: step_review_export,
+    3: step_scenario_generation,
+    4: step_scenario_metadata,
+    5: step_screen_generation,
+    6: step_image_generation,
+    7: step_final_preview,
+}
+
+
 # Main app
 def main():    
     display_header()
     display_progress()
+    step = st.session_state.current_step
     # Handle Step 0 layout with logo column
-    if st.session_state.current_step == 0:
+    if step == 0:
             step_initial_selection()
     else:
         # Display optional details modal (persists through all steps)
         display_optional_details_modal()
         
         # Route to appropriate step
-        if st.session_state.current_step == 0.5:
-            step_existing_content_selection()
-        elif st.session_state.current_step == 1:
-            step_project_setup()
-        elif st.session_state.current_step == 2:
-            step_review_export()
-        elif st.session_state.current_step == 3:
-            step_scenario_generation()
-        elif st.session_state.current_step == 4:
-            step_scenario_metadata()
-        elif st.session_state.current_step == 5:
-            step_screen_generation()
-        elif st.session_state.current_step == 6:
-            step_image_generation()
-        elif st.session_state.current_step == 7:
-            step_final_preview()
+        route = _STEP_ROUTES.get(step)
+        if route is not None:
+            route()
 
 if __name__ == "__main__":
     main()
@@ -1,46 +1,71 @@
 """
 Configuration and session state management for the AI Scenario Builder Tool.
 """
+from types import MappingProxyType
 import streamlit as st
 
 
 def initialize_session_state():
     """Initialize session state variables"""
-    if 'current_step' not in st.session_state:
-        st.session_state.current_step = 0
-    if 'form_data' not in st.session_state:
-        st.session_state.form_data = {
-            "course": {},
-            "project": {},
-            "audience": {},
-            "additional_info": {},
-        }
-    if 'workflow_mode' not in st.session_state:
-        st.session_state.workflow_mode = None  # 'new', 'existing_course', 'existing_module'
+    if '_initialized' in st.session_state:
+        return
+    st.session_state.setdefault('current_step', 0)
+    st.session_state.setdefault('form_data', get_default_form_data())
+    st.session_state.setdefault('workflow_mode', None)  # 'new', 'existing_course', 'existing_module'
+    st.session_state.setdefault('form_data_version', 0)
+    st.session_state.setdefault('screen_data_version', 0)
+    st.session_state.setdefault('_screens_dirty', False)  # screen edits not yet written to screens.json
+    st.session_state._initialized = True
+
+
+# Top-level sections of form_data, each starting out as an empty dict
+FORM_DATA_SECTIONS = ("course", "project", "audience", "additional_info")
 
 
 def get_default_form_data():
     """Return default form data structure"""
-    return {
-        "course": {},
-        "project": {},
-        "audience": {},
-        "additional_info": {},
-    }
+    return {section: {} for section in FORM_DATA_SECTIONS}
 
 
 def reset_session_state():
     """Reset session state to initial values"""
     st.session_state.current_step = 0
     st.session_state.workflow_mode = None
-    st.session_state.form_data = get_default_form_data()
+    # Reuse the existing dict rather than assigning a new one
+    st.session_state.form_data.clear()
+    st.session_state.form_data.update(get_default_form_data())
+    mark_form_data_changed()
+
+
+def mark_form_data_changed():
+    """Bump the form_data version so widgets derived from it are resynced"""
+    st.session_state.form_data_version = st.session_state.get('form_data_version', 0) + 1
+    # The course/module may have changed, so the scenario file is read again
+    st.session_state.scenario_loaded = False
+    # Images still being generated and unsaved screen edits belong to the previous project
+    st.session_state.pop('_pending_images', None)
+    st.session_state.pop('_failed_images', None)
+    st.session_state._screens_dirty = False
+
+
+def mark_screen_data_changed():
+    """Bump the screen_data version after screen_data is replaced or edited outside the image step"""
+    st.session_state.screen_data_version = st.session_state.get('screen_data_version', 0) + 1
+    # Images still being generated were requested from the previous screens,
+    # and edits to those screens no longer need saving
+    st.session_state.pop('_pending_images', None)
+    st.session_state.pop('_failed_images', None)
+    st.session_state._screens_dirty = False
+
+
+PAGE_CONFIG = MappingProxyType({
+    "page_title": "AI Scenario Builder Tool",
+    "page_icon": None,
+    "layout": "wide",
+    "initial_sidebar_state": "expanded"
+})
 
 
 def get_page_config():
     """Return Streamlit page configuration"""
-    return {
-        "page_title": "AI Scenario Builder Tool",
-        "page_icon": None,
-        "layout": "wide",
-        "initial_sidebar_state": "expanded"
-    }
+    return PAGE_CONFIG
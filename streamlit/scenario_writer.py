@@ -1,10 +1,45 @@
 """
 Scenario writer module for generating LLM-based scenario descriptions and content.
 """
-import json
+import functools
+import hashlib
 import os
+import re
+import tempfile
+import orjson
 import streamlit as st
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+
+# Characters dropped from course/module names; equivalent to keeping
+# str.isalnum() characters plus space, hyphen and underscore
+_UNSAFE_NAME_CHARS = re.compile(r"[^\w \-]")
+
+# filepath -> (content digest, mtime_ns) of the last JSON written or verified by this process
+_written_digests: Dict[str, Tuple[bytes, int]] = {}
+
+# Default screen outline as (screen_number, title, caption_description);
+# "{}" in a title is filled with the project title
+_SCREEN_TEMPLATES = (
+    (1, "Introduction to {}", "Welcome screen introducing the project and its objectives"),
+    (2, "Problem Statement", "Presenting the main challenge or problem to be solved"),
+    (3, "Solution Approach", "Outlining the methodology and approach to solve the problem"),
+    (4, "Implementation Steps", "Detailed steps for implementing the solution"),
+    (5, "Results and Outcomes", "Expected results and learning outcomes from the project"),
+)
+
+
+# Image prompt for one caption; the style lines are shared by every screen
+_IMAGE_PROMPT_TEMPLATE = (
+    "Create an image for: {caption}\n"
+    "\n"
+    "Style: {vibe}\n"
+    "Color palette: {palette}\n"
+    "Aspect ratio: {ratio}\n"
+    "Educational content style\n"
+    "Professional and engaging\n"
+    "Clear visual elements\n"
+    "Suitable for learning materials"
+)
 
 
 def generate_scenario_description(form_data: Dict[str, Any]) -> str:
@@ -58,6 +93,14 @@ def generate_image_vibe(style_pack: Dict[str, Any]) -> str:
     vibe = style_pack.get("vibe", "flat_illustration")
     aspect_ratio = style_pack.get("aspect_ratio", "4:3")
     
+    return _image_vibe(palette, vibe, aspect_ratio)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _image_vibe(palette: str, vibe: str, aspect_ratio: str) -> str:
+    """
+    Build the image vibe description, cached on the scalar style fields.
+    """
     vibe_description = f"""
 **Visual Style Guidelines:**
 
@@ -86,35 +129,12 @@ def generate_initial_screens(form_data: Dict[str, Any]) -> List[Dict[str, str]]:
     # Generate initial screens (placeholder - replace with actual LLM call)
     screens = [
         {
-            "screen_number": 1,
-            "title": f"Introduction to {project_title}",
-            "image_description": "",  # To be filled later
-            "caption_description": "Welcome screen introducing the project and its objectives"
-        },
-        {
-            "screen_number": 2,
-            "title": "Problem Statement",
-            "image_description": "",  # To be filled later
-            "caption_description": "Presenting the main challenge or problem to be solved"
-        },
-        {
-            "screen_number": 3,
-            "title": "Solution Approach",
-            "image_description": "",  # To be filled later
-            "caption_description": "Outlining the methodology and approach to solve the problem"
-        },
-        {
-            "screen_number": 4,
-            "title": "Implementation Steps",
+            "screen_number": number,
+            "title": title.format(project_title) if "{" in title else title,
             "image_description": "",  # To be filled later
-            "caption_description": "Detailed steps for implementing the solution"
-        },
-        {
-            "screen_number": 5,
-            "title": "Results and Outcomes",
-            "image_description": "",  # To be filled later
-            "caption_description": "Expected results and learning outcomes from the project"
+            "caption_description": caption_description
         }
+        for number, title, caption_description in _SCREEN_TEMPLATES
     ]
     
     return screens
@@ -129,20 +149,33 @@ def generate_image_description_from_caption(caption: str, style_pack: Dict[str,
     vibe = style_pack.get("vibe", "flat_illustration")
     aspect_ratio = style_pack.get("aspect_ratio", "4:3")
     
+    return _image_description(caption, palette, vibe, aspect_ratio)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _image_description(caption: str, palette: str, vibe: str, aspect_ratio: str) -> str:
+    """
+    Build the image prompt for a caption, cached on the caption and scalar style fields.
+    """
     # Convert caption to image prompt (placeholder - replace with actual LLM call)
-    image_prompt = f"""
-Create an image for: {caption}
-
-Style: {vibe.replace('_', ' ')}
-Color palette: {palette}
-Aspect ratio: {aspect_ratio}
-Educational content style
-Professional and engaging
-Clear visual elements
-Suitable for learning materials
-"""
-    
-    return image_prompt.strip()
+    return _IMAGE_PROMPT_TEMPLATE.format_map(
+        {**_style_fields(palette, vibe, aspect_ratio), "caption": caption}
+    )
+
+
+def _style_fields(palette: str, vibe: str, aspect_ratio: str) -> Dict[str, str]:
+    """
+    Prepare the style placeholders of the image prompt template.
+    """
+    return {"vibe": vibe.replace('_', ' '), "palette": palette, "ratio": aspect_ratio}
+
+
+@functools.lru_cache(maxsize=128)
+def _ensure_dir(dirpath: str) -> None:
+    """
+    Create a directory once per process; later saves to it skip the makedirs stats.
+    """
+    os.makedirs(dirpath, exist_ok=True)
 
 
 def save_scenario_data(scenario_data: Dict[str, Any], filepath: str) -> str:
@@ -150,23 +183,84 @@ def save_scenario_data(scenario_data: Dict[str, Any], filepath: str) -> str:
     Save scenario data to JSON file.
     """
     # Ensure directory exists
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    dirpath = os.path.dirname(filepath)
+    _ensure_dir(dirpath)
+
+    data = orjson.dumps(scenario_data, option=orjson.OPT_INDENT_2)
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    if _unchanged_on_disk(filepath, digest):
+        return filepath
     
-    # Save to JSON
-    with open(filepath, 'w') as f:
-        json.dump(scenario_data, f, indent=2)
+    # Write in a single call, then swap the file into place
+    # so a crash mid-write never leaves a truncated JSON file behind;
+    # each save gets its own temp file so concurrent sessions never share one
+    try:
+        fd, tmp_filepath = tempfile.mkstemp(dir=dirpath, suffix=".tmp")
+    except FileNotFoundError:
+        # The directory was removed after _ensure_dir cached it; create it again and retry once
+        _ensure_dir.cache_clear()
+        _ensure_dir(dirpath)
+        fd, tmp_filepath = tempfile.mkstemp(dir=dirpath, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb', buffering=65536) as f:
+            f.write(data)
+        # mkstemp creates the file readable by the owner only
+        os.chmod(tmp_filepath, 0o644)
+        os.replace(tmp_filepath, filepath)
+    except Exception:
+        os.unlink(tmp_filepath)
+        raise
+    _written_digests[filepath] = (digest, os.stat(filepath).st_mtime_ns)
     
     return filepath
 
 
+def _unchanged_on_disk(filepath: str, digest: bytes) -> bool:
+    """
+    Check whether filepath already holds content with the given digest.
+    A file last written or verified by this process is judged from its mtime without reading it;
+    the file is only read and hashed when its mtime is unknown.
+    """
+    try:
+        mtime = os.stat(filepath).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    known = _written_digests.get(filepath)
+    if known is not None and known[1] == mtime:
+        # The file is as this process last saw it, so the stored digest is authoritative
+        return known[0] == digest
+    with open(filepath, 'rb') as f:
+        on_disk = hashlib.blake2b(f.read(), digest_size=16).digest()
+    _written_digests[filepath] = (on_disk, mtime)
+    return on_disk == digest
+
+
 def load_scenario_data(filepath: str) -> Dict[str, Any]:
     """
     Load scenario data from JSON file.
+    Parsed contents are cached until the file's modification time changes.
     """
-    if os.path.exists(filepath):
-        with open(filepath, 'r') as f:
-            return json.load(f)
-    return {}
+    try:
+        mtime = os.stat(filepath).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    return _read_json(filepath, mtime)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _read_json(filepath: str, mtime: int) -> Dict[str, Any]:
+    """
+    Read and parse a JSON file; mtime is only part of the cache key.
+    """
+    with open(filepath, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def clean_name(name: str) -> str:
+    """
+    Strip characters unsafe for directory names and replace spaces with underscores.
+    """
+    return _UNSAFE_NAME_CHARS.sub("", name).rstrip().replace(' ', '_')
 
 
 def get_scenario_filepath(form_data: Dict[str, Any]) -> str:
@@ -176,9 +270,17 @@ def get_scenario_filepath(form_data: Dict[str, Any]) -> str:
     course_title = form_data["course"].get("course_title", "unknown_course")
     module_title = form_data["project"].get("module_title", "unknown_module")
     
+    return _build_scenario_filepath(course_title, module_title)
+
+
+@functools.lru_cache(maxsize=32)
+def _build_scenario_filepath(course_title: str, module_title: str) -> str:
+    """
+    Build the scenario data filepath for a course/module title pair.
+    """
     # Clean names for directory structure
-    course_name = "".join(c for c in course_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-    module_name = "".join(c for c in module_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
+    course_name = clean_name(course_title)
+    module_name = clean_name(module_title)
     
     # Create filepath
     base_path = "data"
@@ -187,4 +289,4 @@ def get_scenario_filepath(form_data: Dict[str, Any]) -> str:
     text_outputs_path = os.path.join(module_path, "text_outputs")
     filename = "scenario_descriptions.json"
     
-    return os.path.join(text_outputs_path, filename)
+    return os.path.join(text_outputs_path, filename)
\ No newline at end of file
@@ -3,15 +3,25 @@ Step functions for the AI Scenario Builder Tool workflow.
 """
 import json
 import os
+import re
 import html
 import base64
-import io
-import zipfile
-from PIL import Image, ImageDraw, ImageFont
+import functools
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+import pandas as pd
 import streamlit as st
-import openai
-from utils import get_existing_courses, get_existing_modules, save_to_json
-from config import get_default_form_data
+from utils import (
+    get_existing_courses,
+    get_existing_modules,
+    get_course_module_map,
+    get_module_path,
+    save_to_json,
+    clear_existing_content_cache
+)
+from config import get_default_form_data, mark_form_data_changed, mark_screen_data_changed
+from ui_components import _dir_signature, _zip_output_dir
 from scenario_writer import (
     generate_scenario_description,
     generate_image_vibe,
@@ -19,42 +29,355 @@ from scenario_writer import (
     generate_image_description_from_caption,
     save_scenario_data,
     load_scenario_data,
-    get_scenario_filepath
+    get_scenario_filepath,
+    clean_name
+)
+
+# Caption fonts tried in order when compositing screens
+CAPTION_FONT_PATHS = (
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/System/Library/Fonts/Helvetica.ttc",
+    "arial.ttf",
+)
+
+# Largest side of a composited screen; matches the largest image size requested from the API
+COMPOSITE_MAX_SIZE = 1536
+# zlib level for composited PNGs; level 1 encodes several times faster than the default 6
+COMPOSITE_PNG_COMPRESS_LEVEL = 1
+
+# Image requests in flight at once across the process; bounded to stay within API rate limits
+IMAGE_GENERATION_WORKERS = 5
+
+# Screens on each side of the current one shown in the generated screens grid
+GRID_WINDOW_RADIUS = 2
+GRID_WINDOW_SIZE = 2 * GRID_WINDOW_RADIUS + 1
+
+# Editable fields of an actor, in display order
+ACTOR_FIELDS = ["name", "role", "purpose", "appearance"]
+
+# Sidebar widget keys dropped whenever the underlying data changes
+SIDEBAR_KEYS = frozenset({
+    "sidebar_scenario_edit", "sidebar_num_screens", "sidebar_aspect_ratio",
+    "sidebar_visual_style", "sidebar_screen_0_caption", "sidebar_screen_0_img",
+    "modal_professional_domain", "modal_course_description", "modal_key_concept",
+    "modal_existing_challenge", "optional_additional_info",
+})
+SIDEBAR_KEY_PREFIXES = ("sidebar_actor_", "sidebar_screen_")
+
+# Sections of the review step as (title, form_data section, fields);
+# each field is (label, key, optional) and optional fields are shown only when filled in
+REVIEW_SECTIONS = (
+    (" Course Information", "course", (
+        ("Course/Program", "course_title", False),
+        ("Course Objectives", "course_objectives", True),
+    )),
+    (" Module & Learning Information", "project", (
+        ("Module/Topic", "module_title", False),
+        ("Module Description", "module_description", True),
+        ("Key Concept", "key_concept", False),
+        ("Existing Challenge", "existing_challenge", False),
+        ("Learning Objectives", "project_learning_objectives", True),
+    )),
+    ("Audience", "audience", (
+        ("Professional Domain", "professional_domain", False),
+    )),
+    (" Course Description", "course", (
+        ("Description", "course_description", False),
+    )),
 )
 
+# Hides the type-to-search input of selectboxes on the existing content step
+SELECTBOX_NO_SEARCH_CSS = """
+<style>
+/* Hide the search input inside the new Selectbox widget */
+.stSelectbox [data-baseweb="select"] input {
+    opacity: 0 !important;         /* Hide text */
+    height: 0 !important;          /* Collapse visible height */
+    padding: 0 !important;
+    margin: 0 !important;
+    border: none !important;
+}</style>
+"""
+
+# Expander styling for the image prompt tips
+TIPS_EXPANDER_CSS = """
+<style>
+
+/* Make entire expander border teal */
+details {
+    # border: 2px solid #00847F !important;
+    border-radius: 6px !important;
+    overflow: hidden;
+}
+
+/* Style the expander header bar */
+details > summary {
+    # background-color: #00847F !important;
+    # color: white !important;
+    # padding: 0.75rem !important;
+    font-weight: 600 !important;
+    list-style: none !important;
+}
+
+</style>
+"""
+
+# Guidance shown while editing image prompts
+IMAGE_PROMPT_TIPS = """
+**Make characters feel real**
+
+Include a mix of ages, genders, and ethnicities.
+
+Describe people naturally and avoid stereotypes.
+
+**Keep the visuals clear**
+
+Mention lighting, mood, and the setting so the scene is easy to picture.
+
+Avoid including text in images.
+
+**Add useful context**
+
+Describe where the scene takes place and what's happening.
+
+Include relevant objects or details that support the learning goal.
+
+**Avoid abstract ideas**
+
+Stay away from metaphors or concepts that are difficult for AI to render literally.
+"""
+
 
 def _sanitize_name(value, fallback):
-    cleaned = "".join(c for c in value if c.isalnum() or c in (" ", "-", "_")).rstrip().replace(" ", "_")
-    return cleaned or fallback
+    return clean_name(value) or fallback
 
 
-def _clear_sidebar_keys():
-    """Clear sidebar widget keys to force sync with updated data"""
-    keys_to_clear = ["sidebar_scenario_edit", "sidebar_num_screens", "sidebar_aspect_ratio", 
-                     "sidebar_visual_style", "sidebar_screen_0_caption", "sidebar_screen_0_img",
-                     "modal_professional_domain", "modal_course_description", "modal_key_concept",
-                     "modal_existing_challenge", "optional_additional_info"]
-    for key in list(st.session_state.keys()):
-        if key.startswith("sidebar_actor_") or key.startswith("sidebar_screen_") or key in keys_to_clear:
-            del st.session_state[key]
+def _clear_sidebar_keys(only_if_stale=False):
+    """
+    Clear sidebar widget keys to force sync with updated data.
+    With only_if_stale, skip the sweep when form_data hasn't changed since the last one.
+    """
+    version = st.session_state.get("form_data_version", 0)
+    if only_if_stale and st.session_state.get("_sidebar_cleared_version") == version:
+        return
+    st.session_state._sidebar_cleared_version = version
+    for key in [key for key in st.session_state if key.startswith(SIDEBAR_KEY_PREFIXES) or key in SIDEBAR_KEYS]:
+        del st.session_state[key]
 
-def _get_text_output_dir():
+def _project_paths():
+    """
+    Output paths of the current course/module.
+    Resolved, and the directories created, once per title pair for this session.
+    """
     course_title = st.session_state.form_data["course"].get("course_title", "")
     module_title = st.session_state.form_data["project"].get("module_title", "")
+    cached = st.session_state.get("_project_paths")
+    if cached and cached[0] == (course_title, module_title):
+        return cached[1]
     course_name = _sanitize_name(course_title, "course")
     module_name = _sanitize_name(module_title, "module")
     base_dir = os.path.join("data", course_name, module_name, "text_outputs")
-    os.makedirs(base_dir, exist_ok=True)
-    return base_dir
+    paths = {
+        "base": base_dir,
+        "scenario": os.path.join(base_dir, "scenario_descriptions.json"),
+        "metadata": os.path.join(base_dir, "scenario_metadata.json"),
+        "screens": os.path.join(base_dir, "screens.json"),
+        "images": os.path.join(base_dir, "generated_images.json"),
+        "images_dir": os.path.join(base_dir, "images"),
+    }
+    os.makedirs(paths["images_dir"], exist_ok=True)
+    st.session_state._project_paths = ((course_title, module_title), paths)
+    return paths
+
+
+def _get_text_output_dir():
+    return _project_paths()["base"]
+
+
+def _image_relpath(index):
+    """Manifest path of the PNG for the screen at index, relative to text_outputs"""
+    return f"images/screen_{index + 1}.png"
+
+
+def _raw_image_path(base_dir, index):
+    """Path of the decoded PNG for the screen at index"""
+    return os.path.join(base_dir, *_image_relpath(index).split("/"))
+
+
+def _write_raw_image(base_dir, index, image_b64):
+    """Decode a generated image once and keep it on disk as a plain PNG"""
+    raw_path = _raw_image_path(base_dir, index)
+    image_bytes = base64.b64decode(image_b64)
+    try:
+        f = open(raw_path, "wb")
+    except FileNotFoundError:
+        # The images directory was removed after _project_paths created it; create it again and retry once
+        os.makedirs(os.path.dirname(raw_path), exist_ok=True)
+        f = open(raw_path, "wb")
+    with f:
+        f.write(image_bytes)
+
+
+def _has_image(images, index):
+    """Whether the screen at index has a generated image"""
+    return index < len(images) and bool(images[index].get("image_path"))
+
+
+def _image_bytes(entry):
+    """Bytes of a generated image, read from its PNG once per file modification"""
+    image_file = os.path.join(_get_text_output_dir(), *entry["image_path"].split("/"))
+    return _read_image_file(image_file, os.stat(image_file).st_mtime_ns)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _read_image_file(image_file, mtime):
+    """Read an image file; mtime is only part of the cache key"""
+    with open(image_file, 'rb') as f:
+        return f.read()
 
 
 def _persist_generated_images():
     if "generated_images" not in st.session_state:
         return
-    base_dir = _get_text_output_dir()
-    filepath = os.path.join(base_dir, "generated_images.json")
-    with open(filepath, "w") as f:
-        json.dump(st.session_state.generated_images, f, indent=2)
+    filepath = _project_paths()["images"]
+
+    # Session entries already match the manifest: image bytes live in images/screen_N.png.
+    # Skipped when the manifest on disk already matches, e.g. on repeated accepts
+    save_scenario_data(st.session_state.generated_images, filepath)
+
+
+def _load_generated_images(images_path):
+    """
+    Load the image manifest; images stay on disk and are read only when displayed.
+    Legacy entries that embed image_b64 are written out as PNGs and converted to paths.
+    """
+    with open(images_path, 'rb') as f:
+        entries = orjson.loads(f.read())
+    base_dir = os.path.dirname(images_path)
+    for i, entry in enumerate(entries):
+        image_b64 = entry.pop("image_b64", None)
+        if image_b64 and not entry.get("image_path"):
+            os.makedirs(os.path.join(base_dir, "images"), exist_ok=True)
+            _write_raw_image(base_dir, i, image_b64)
+            entry["image_path"] = _image_relpath(i)
+        elif entry.get("image_path") and not os.path.isfile(os.path.join(base_dir, *entry["image_path"].split("/"))):
+            # The PNG was removed; treat the screen as not generated
+            entry["image_path"] = None
+    return entries
+
+
+def _load_json_file(filepath):
+    with open(filepath, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+# Files restored when resuming an existing module, with the loader for each
+RESUME_LOADERS = (
+    ("scenario_descriptions.json", _load_json_file),
+    ("scenario_metadata.json", _load_json_file),
+    ("screens.json", _load_json_file),
+    ("generated_images.json", _load_generated_images),
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_font(size):
+    """Load the caption font once per size, falling back to Pillow's default font"""
+    from PIL import ImageFont
+
+    for font_path in CAPTION_FONT_PATHS:
+        try:
+            return ImageFont.truetype(font_path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=4096)
+def _text_length(font, text):
+    """Rendered advance width of text, cached per font and string"""
+    return font.getlength(text)
+
+
+def _wrap_caption(caption, font, max_width):
+    """Greedily wrap caption into lines no wider than max_width; returns (lines, line_widths)"""
+    space_width = _text_length(font, " ")
+    lines = []
+    line_widths = []
+    current_line = []
+    running = 0
+    for word in caption.split():
+        word_width = _text_length(font, word)
+        if current_line and running + space_width + word_width <= max_width:
+            current_line.append(word)
+            running += space_width + word_width
+        else:
+            if current_line:
+                lines.append(' '.join(current_line))
+                line_widths.append(int(running))
+            current_line = [word]
+            running = word_width
+    if current_line:
+        lines.append(' '.join(current_line))
+        line_widths.append(int(running))
+    return lines, line_widths
+
+
+def _render_one(i, screen, raw_path, output_folder):
+    """Composite the caption onto one screen image and save it as screen_{i+1}.png"""
+    from PIL import Image, ImageDraw
+
+    caption = screen.get("caption", "")
+
+    img = Image.open(raw_path)
+    # Bound oversized sources before any pixel work; generated sizes are already within the cap
+    img.thumbnail((COMPOSITE_MAX_SIZE, COMPOSITE_MAX_SIZE), Image.Resampling.LANCZOS)
+
+    if caption:
+        width, height = img.size
+        # Work in RGB throughout; only the caption box region is blended in RGBA
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        font = _get_font(20)
+
+        max_box_width = int(width * 0.9) - 48
+        lines, text_widths = _wrap_caption(caption, font, max_box_width)
+
+        a_bbox = font.getbbox("A")
+        line_height = int(a_bbox[3] - a_bbox[1])
+        padding = 18
+        max_text_width = max(text_widths) if text_widths else 0
+        box_width = max_text_width + padding * 2
+        box_height = len(lines) * int(line_height * 1.4) + padding * 2
+
+        box_left = (width - box_width) // 2
+        box_bottom = height - 24
+        box_top = box_bottom - box_height
+        radius = 14
+
+        # Blend only the caption box region instead of a full-frame overlay
+        overlay = Image.new('RGBA', (box_width + 1, box_height + 1), (255, 255, 255, 0))
+        overlay_draw = ImageDraw.Draw(overlay)
+
+        overlay_draw.rounded_rectangle([0, 0, box_width, box_height],
+                                       radius=radius, fill=(255, 255, 255, 240),
+                                       outline=(0, 0, 0, 30), width=1)
+
+        region_box = (box_left, box_top, box_left + box_width + 1, box_top + box_height + 1)
+        region = img.crop(region_box).convert('RGBA')
+        region.alpha_composite(overlay)
+        img.paste(region.convert('RGB'), region_box[:2])
+        draw = ImageDraw.Draw(img)
+
+        start_y = box_top + padding
+        for j, line in enumerate(lines):
+            text_x = (width - text_widths[j]) // 2
+            text_y = start_y + j * int(line_height * 1.4)
+            draw.text((text_x, text_y), line, fill=(18, 18, 18), font=font)
+
+    output_path = os.path.join(output_folder, f"screen_{i+1}.png")
+    img.save(output_path, "PNG", compress_level=COMPOSITE_PNG_COMPRESS_LEVEL)
 
 
 def _save_composited_images(screens, images):
@@ -63,119 +386,220 @@ def _save_composited_images(screens, images):
     output_folder = os.path.join(base_dir, "composited_screens")
     os.makedirs(output_folder, exist_ok=True)
     
-    for i, screen in enumerate(screens):
-        if i < len(images) and images[i].get("image_b64"):
-            try:
-                image_b64 = images[i].get("image_b64", "")
-                caption = screen.get("caption", "")
-                
-                img_data = base64.b64decode(image_b64)
-                img = Image.open(io.BytesIO(img_data))
-                draw = ImageDraw.Draw(img)
-                
-                if caption:
-                    width, height = img.size
-                    img_rgba = img.convert('RGBA')
-                    temp_draw = ImageDraw.Draw(img_rgba)
-                    
-                    try:
-                        font = ImageFont.truetype("/System/Library/Fonts/Supplemental/Arial.ttf", 20)
-                    except:
-                        try:
-                            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 20)
-                        except:
-                            try:
-                                font = ImageFont.truetype("arial.ttf", 20)
-                            except:
-                                font = ImageFont.load_default()
-                    
-                    max_box_width = int(width * 0.9) - 48
-                    words = caption.split()
-                    lines = []
-                    current_line = []
-                    for word in words:
-                        test_line = ' '.join(current_line + [word]) if current_line else word
-                        bbox = temp_draw.textbbox((0, 0), test_line, font=font)
-                        if bbox[2] - bbox[0] <= max_box_width:
-                            current_line.append(word)
-                        else:
-                            if current_line:
-                                lines.append(' '.join(current_line))
-                            current_line = [word]
-                    if current_line:
-                        lines.append(' '.join(current_line))
-                    
-                    line_height = int(temp_draw.textbbox((0, 0), "A", font=font)[3] - temp_draw.textbbox((0, 0), "A", font=font)[1])
-                    padding = 18
-                    text_widths = [temp_draw.textbbox((0, 0), line, font=font)[2] - temp_draw.textbbox((0, 0), line, font=font)[0] for line in lines]
-                    max_text_width = max(text_widths) if text_widths else 0
-                    box_width = max_text_width + padding * 2
-                    box_height = len(lines) * int(line_height * 1.4) + padding * 2
-                    
-                    box_left = (width - box_width) // 2
-                    box_right = box_left + box_width
-                    box_bottom = height - 24
-                    box_top = box_bottom - box_height
-                    radius = 14
-                    
-                    overlay = Image.new('RGBA', img.size, (255, 255, 255, 0))
-                    overlay_draw = ImageDraw.Draw(overlay)
-                    
-                    overlay_draw.rounded_rectangle([box_left, box_top, box_right, box_bottom], 
-                                                   radius=radius, fill=(255, 255, 255, 240), 
-                                                   outline=(0, 0, 0, 30), width=1)
-                    
-                    img_rgba = Image.alpha_composite(img_rgba, overlay)
-                    draw = ImageDraw.Draw(img_rgba)
-                    
-                    start_y = box_top + padding
-                    for j, line in enumerate(lines):
-                        bbox = draw.textbbox((0, 0), line, font=font)
-                        text_width = bbox[2] - bbox[0]
-                        text_x = (width - text_width) // 2
-                        text_y = start_y + j * int(line_height * 1.4)
-                        draw.text((text_x, text_y), line, fill=(18, 18, 18), font=font)
-                    
-                    img = img_rgba.convert('RGB')
-                
-                output_path = os.path.join(output_folder, f"screen_{i+1}.png")
-                img.save(output_path, "PNG")
-            except Exception as e:
-                st.error(f"Error saving screen {i+1}: {str(e)}")
+    jobs = [
+        (i, screen, os.path.join(base_dir, *images[i]["image_path"].split("/")))
+        for i, screen in enumerate(screens)
+        if _has_image(images, i)
+    ]
+    if not jobs:
+        return output_folder
+
+    # Decode, draw and PNG-encode screens in parallel; Pillow releases the GIL for most of it
+    with ThreadPoolExecutor(max_workers=min(8, len(jobs))) as executor:
+        futures = [
+            (i, executor.submit(_render_one, i, screen, raw_path, output_folder))
+            for i, screen, raw_path in jobs
+        ]
+
+    # Streamlit calls must stay on the script thread, so report errors after the join
+    for i, future in futures:
+        error = future.exception()
+        if error is not None:
+            st.error(f"Error saving screen {i+1}: {str(error)}")
     
     return output_folder
 
 
-def generate_scenario_summaries_with_gpt(form_data, existing_scenario_data):
+@st.cache_resource(show_spinner=False)
+def _openai_client():
+    """One OpenAI client per process so its HTTP connection pool is reused across calls"""
+    import openai
+
+    # The SDK retries rate limits, timeouts and 5xx responses with exponential backoff and jitter
+    return openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=4, timeout=120.0)
+
+
+def _stream_completion(client, placeholder, language=None, on_update=None, **kwargs):
     """
-    Generate three short scenario summaries using GPT-4.1 based on form data and existing scenario data.
+    Stream a chat completion into placeholder as tokens arrive and return the full text.
+    With language set, the partial output is shown as a code block (e.g. JSON) instead of markdown;
+    with on_update set, it receives the partial text and does its own rendering.
     """
-    try:
-        # Set up OpenAI client
-        client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        
-        # Extract key information from form data
-        # Extract all fields present in example context.json and include if they exist
-        # Course information
-        course_title = form_data.get("course", {}).get("course_title", "")
-        course_description = form_data.get("course", {}).get("course_description", "")
-
-        # Project/module information
-        module_title = form_data.get("project", {}).get("module_title", "")
-        key_concept = form_data.get("project", {}).get("key_concept", "")
-        existing_challenge = form_data.get("project", {}).get("existing_challenge", "")
-
-        # Audience information
-        professional_domain = form_data.get("audience", {}).get("professional_domain", "")
-
-        # General additional_info (not audience)
-        additional_info = form_data.get("additional_info", "")
+    parts = []
+    for chunk in client.chat.completions.create(stream=True, **kwargs):
+        if chunk.choices and chunk.choices[0].delta.content:
+            parts.append(chunk.choices[0].delta.content)
+            if on_update:
+                on_update("".join(parts))
+            elif language:
+                placeholder.code("".join(parts), language=language)
+            else:
+                placeholder.markdown("".join(parts))
+    placeholder.empty()
+    return "".join(parts)
+
+
+def _screen_stream_renderer(placeholder):
+    """
+    Build an on_update callback that shows each screen in placeholder as soon as
+    its JSON object is complete in the streamed response.
+    """
+    decoder = json.JSONDecoder()
+    screens = []
+    offset = None
+
+    def render(text):
+        nonlocal offset
+        if offset is None:
+            # Screen objects start after the opening bracket of the "screens" array
+            key_pos = text.find('"screens"')
+            bracket_pos = text.find("[", key_pos) if key_pos >= 0 else -1
+            if bracket_pos < 0:
+                return
+            offset = bracket_pos + 1
         
-        # Extract existing scenario context if available
-        existing_description = existing_scenario_data.get("scenario_description", "") if existing_scenario_data else ""
+        added = False
+        while True:
+            start = text.find("{", offset)
+            if start < 0:
+                break
+            try:
+                screen, end = decoder.raw_decode(text, start)
+            except json.JSONDecodeError:
+                # The next screen object is still streaming in
+                break
+            screens.append(screen)
+            offset = end
+            added = True
         
-        # Create the prompt for GPT-4.1
-        prompt = f"""
+        if added:
+            with placeholder.container():
+                for i, screen in enumerate(screens):
+                    st.markdown(f"**Screen {screen.get('screen_number', i + 1)}:** {screen.get('caption', '')}")
+
+    return render
+
+
+def _build_image_request(screens, index):
+    """Build the (prompt, size) pair for one screen's image from its description and the scenario metadata"""
+    metadata = st.session_state.metadata_data
+    visual_style = metadata.get("visual_style", "A vibrant, semi-realistic digital illustration in a modern vector art style, with soft gradients, clean lines, and cinematic lighting.")
+    aspect_ratio = metadata.get("aspect_ratio", "16:9")
+
+    actors = metadata.get("actors", [])
+    actor_appearances = [f"{a.get('name', '')}: {a.get('appearance', '')}" for a in actors if a.get("appearance")]
+    actor_context = f" Character appearances for consistency: {'. '.join(actor_appearances)}." if actor_appearances else ""
+
+    # Include previous screen context for consistency
+    prev_context = ""
+    if index > 0:
+        prev_desc = screens[index - 1].get("image_description", "")
+        if prev_desc:
+            prev_context = f" Previous screen context for visual consistency: {prev_desc}. "
+
+    # Scenario-wide text goes first so consecutive screens share the same prompt prefix
+    image_prompt = f"Style: {visual_style}. Aspect ratio: {aspect_ratio}.{actor_context} {prev_context}Scene: {screens[index].get('image_description', '')}"
+    size = (
+        "1024x1024" if aspect_ratio == "1:1"
+        else "1536x1024" if aspect_ratio == "16:9"
+        else "1024x1536"
+    )
+    return image_prompt, size
+
+
+def _generate_image_b64(client, prompt, size):
+    """Generate one image and return it as base64; safe to call from worker threads"""
+    response = client.images.generate(
+        model="gpt-image-1-mini",
+        prompt=prompt,
+        size=size,
+    )
+    # gpt-image-1-mini returns base64 in b64_json
+    return response.data[0].b64_json
+
+
+def _store_generated_image(base_dir, index, image_b64):
+    """Write a generated image as PNG under base_dir and record its path in the session"""
+    _write_raw_image(base_dir, index, image_b64)
+
+    images = st.session_state.generated_images
+    # Ensure the index exists inside the session list
+    if index >= len(images):
+        images.extend({} for _ in range(index - len(images) + 1))
+
+    images[index] = {
+        "image_path": _image_relpath(index),
+        "accepted": False,
+        "screen_number": index + 1
+    }
+
+
+def _missing_image_indices(screens):
+    """Indices of screens that have no generated image yet"""
+    images = st.session_state.generated_images
+    return [i for i in range(len(screens)) if not _has_image(images, i)]
+
+
+@st.cache_resource(show_spinner=False)
+def _image_executor():
+    """
+    Process-wide worker pool for image requests; bounded to stay within API rate limits.
+    Requests outlive the rerun that started them, so the UI stays interactive meanwhile.
+    """
+    return ThreadPoolExecutor(max_workers=IMAGE_GENERATION_WORKERS)
+
+
+def _submit_image_generation(screens, indices):
+    """
+    Start generating images for the given screens in the background.
+    Requests are built here because worker threads cannot read session state.
+    Each request is bound to the output directory and screen_data version it was made for.
+    """
+    pending = st.session_state.setdefault("_pending_images", {})
+    failed = st.session_state.setdefault("_failed_images", {})
+    base_dir = _get_text_output_dir()
+    version = st.session_state.get("screen_data_version", 0)
+    client = _openai_client()
+    executor = _image_executor()
+    for i in indices:
+        if i not in pending:
+            prompt, size = _build_image_request(screens, i)
+            failed.pop(i, None)
+            pending[i] = (base_dir, version, executor.submit(_generate_image_b64, client, prompt, size))
+
+
+def _collect_finished_images():
+    """
+    Store images whose background generation has finished.
+    Failed requests are kept in st.session_state._failed_images until the screen is requested again;
+    results for another project or for screens that have since changed are dropped.
+    """
+    pending = st.session_state.get("_pending_images")
+    if not pending:
+        return
+    failed = st.session_state.setdefault("_failed_images", {})
+    current = (_get_text_output_dir(), st.session_state.get("screen_data_version", 0))
+    stored = False
+    for i, (base_dir, version, future) in list(pending.items()):
+        if not future.done():
+            continue
+        del pending[i]
+        if (base_dir, version) != current:
+            continue
+        try:
+            _store_generated_image(base_dir, i, future.result())
+            stored = True
+        except Exception as e:
+            failed[i] = str(e)
+    if stored:
+        _persist_generated_images()
+
+
+# "SCENARIO N:" label that starts each summary in the GPT response
+SCENARIO_LABEL_RE = re.compile(r"^SCENARIO\s+[1-3]:\s*")
+
+# Prompt for the three scenario summaries; placeholders are filled from form_data
+SCENARIO_SUMMARIES_PROMPT = """
 You are an expert instructional designer and learning experience designer who creates short, realistic, and motivating learning scenarios for higher education and professional audiences. Each scenario should connect the key concept to real-world practice, reflect the learners' context, and feel authentic to their field.
 
 Using the information below, generate exactly 3 short scenario summaries (2–3 sentences each) that will help learners see the relevance and value of this concept or skill.
@@ -220,20 +644,237 @@ Additional Information: LLMs are becoming increasingly important in content mode
 A suitable scenario summary could be:
 safeChats is a fast-growing social media platform with active users worldwide. Their Trust and Safety team needs help strengthening content moderation systems and reducing costs. Currently, they use traditional sentiment analysis that flags posts as hate speech or not, but provides no explanations. Users complain about unfair flagging, and human reviewers spend extra time interpreting decisions. Their system also performs poorly in other languages. They're exploring Generative AI and LLMs because these can understand context, sarcasm, and nuance in multiple languages, explain reasoning in natural language, suggest better moderation responses, and continuously improve through feedback loops.
 """
+
+
+# Prompt for rewriting the selected scenario with "Update with AI"
+SCENARIO_UPDATE_PROMPT = """
+You are an expert instructional designer and learning experience designer who creates short, realistic, and motivating learning scenarios for higher education and professional audiences. Each scenario should connect the key concept to real-world practice, reflect the learners' context, and feel authentic to their field.
+
+Based on the following inputs, update the current scenario according to the update instructions:
+Current scenario: {edited_scenario}
+Update instructions: {update_instructions}
+
+Inputs:
+- Course: {course_title}
+- Course Description: {course_description}
+- Professional Domain: {professional_domain}
+- Module Description: {module_title}
+- Key Concept or Learning Objective: {key_concept}
+- Learners' Existing Knowledge: {existing_challenge}
+- Additional Information: {additional_info}
+
+Scenarios should
+1. Be **realistic and relevant** to the learner profile and course context.
+2. Clearly illustrate **how the key concept or skill applies in practice**.
+3. Present a situation or challenge that encourages **critical thinking or decision-making**.
+4. Use **authentic, inclusive examples** (diverse names, roles, and settings).
+5. Specify a **clear setting or context** (e.g., workplace, community, field site, research team, or organizational meeting).
+6. Feel **motivating and purposeful** — learners should understand why the skill or concept matters.
+7. Be 2-3 sentences long. Do not add any other text or formatting.
+
+**IMPORTANT: Each scenario must:**
+- Write in plain, professional language suitable for higher education or adult learners.
+- Keep tone **practical, motivational, and grounded in real-world settings**.
+- Avoid jargon or overly academic phrasing.
+- Focus on what’s happening and why it matters — not on lengthy backstories or character details.
+
+**CRITICAL:** Your response must contain ONLY the scenario text. No prefixes, no labels, no metadata, no explanations - just the scenario itself.
+
+Example of correct format:
+safeChats is a fast-growing social media platform with active users worldwide. Their Trust and Safety team needs help strengthening content moderation systems and reducing costs. Currently, they use traditional sentiment analysis that flags posts as hate speech or not, but provides no explanations. Users complain about unfair flagging, and human reviewers spend extra time interpreting decisions. Their system also performs poorly in other languages. They're exploring Generative AI and LLMs because these can understand context, sarcasm, and nuance in multiple languages, explain reasoning in natural language, suggest better moderation responses, and continuously improve through feedback loops.
+"""
+
+# Prompt for extracting screen count, aspect ratio and actors from the final scenario
+METADATA_PROMPT = """You are an instructional scenario designer. Based on the scenario description, extract key visual and narrative metadata.
+
+Scenario: {final_scenario}
+
+Course: {course_title}
+Module: {module_title}
+
+Your task:
+1. Determine how many visual screens are needed to convey the scenario effectively (usually between 3 and 7).
+2. Recommend the most suitable aspect ratio for these screens (e.g., 16:9, 9:16, 1:1) based on the learning context.
+3. Identify the main character:
+   - Include name, role or title, and a clear explanation of their *objective* and *decision-making context* in the scenario.
+4. Identify any side or supporting characters (only if they contribute meaningfully to the scenario's progression). There should be either 0 or 1 supporting character:
+   - Include name, role or title, and a concise explanation of how they *interact with or influence the main character's goal*.
+5. For each character, provide a brief visual appearance description to ensure visual consistency across images. IMPORTANT: Characters should be diverse in terms of ethnicity, gender, age, and other characteristics. Avoid stereotypes and ensure representation reflects real-world diversity.
+
+Output strictly in JSON format:
+{{
+  "num_screens": <integer>,
+  "aspect_ratio": "<string>",
+  "actors": [
+    {{
+      "name": "<string>",
+      "role": "<string>",
+      "purpose": "<describe what they are trying to accomplish and how their actions or perspective drive the scenario forward>",
+      "appearance": "<brief visual description including age, ethnicity, gender, and distinctive features. Ensure diversity>"
+    }},
+    {{
+      "name": "<string>",
+      "role": "<string>",
+      "purpose": "<describe how this supporting character enables, challenges, or informs the main character's decisions>",
+      "appearance": "<brief visual description including age, ethnicity, gender, and distinctive features. Ensure diversity>"
+    }}
+  ]
+}}"""
+
+
+# System message for screen generation; it never changes between calls so the
+# API can serve it from its prompt cache, and only SCREENS_PROMPT varies
+SCREENS_SYSTEM_PROMPT = """You are an expert instructional designer and learning experience designer who creates short, realistic, and motivating learning scenarios for higher education and professional audiences. Each scenario should connect the key concept to real-world practice, reflect the learners' context, and feel authentic to their field.
+
+**Goal:** Create the requested number of sequential screens that visually tell the story the user describes. The PRIMARY focus should be on clearly depicting and reinforcing the learning objective the user gives. Each screen should directly connect to how this concept is applied, learned, or demonstrated in the scenario.
+
+**Story Arc:**
+Follow the traditional story structure of:
+1. **Beginning** – Introduce the context, characters, and the inciting incident that sets the story in motion.
+2. **Rising Action** – Build tension or challenge as the main event or conflict unfolds.
+3. **Climax** – Present the turning point or key decision moment.
+4. **Falling Action** – Show the outcome or consequence of that moment.
+5. **Resolution** – End with an insight, learning, or call to action that ties back to the learning goal.
+
+**Guidelines:**
+1. Each screen should advance the story in a logical and emotionally engaging way, aligned with the storytelling arc above.
+2. Write **image_description** as if it will be sent directly to a generative image model. Use vivid, cinematic visual language that describes:
+   - The setting, mood, and lighting
+   - Character expressions, gestures, and positions
+   - Relevant props, backgrounds, and atmosphere
+3. Avoid elements that generative AI renders poorly:
+   - No text, labels, symbols, or charts
+   - No diagrams, models, mockups, graphs, or technical visualizations
+   - No complex abstractions (e.g., metaphors, irony, conceptual visuals)
+   - Focus ONLY on scenes, people, environments, and objects that can be realistically photographed or illustrated
+   - Instead of mentioning character names, the focus on image generation is more on the character visual.
+4. Write **caption** as a short motivational or descriptive text that connects the visual to the story and learning objective.
+   - Keep captions natural, concise, and meaningful.
+
+**Learning Objective Focus:**
+- Each screen should prioritize showing the learning objective in action, not just character interactions.
+- Focus on the conceptual understanding, problem-solving, or skill demonstration related to the learning objective.
+- Character interactions should serve to illustrate the learning objective, not be the main focus.
+
+**Storytelling Best Practices:**
+- Maintain tone consistency across all screens (same mood, pacing, and style).
+- Use human-centered details (body language, environment, emotion) to make the story relatable.
+- End with insight or resolution that ties directly back to the learning objective.
+
+Format as JSON:
+{
+  "screens": [
+    {"screen_number": 1, "image_description": "", "caption": ""},
+    {"screen_number": 2, "image_description": "", "caption": ""}
+  ]
+}
+
+Example response:
+Scenario: safeChats is a fast-growing social media platform, having active users everyday around the world and users posts in multiple languages. The Trust and Safety team of safeChats wants to strengthen their content moderation system and reduce moderation costs. Currently, they use traditional sentiment analysis that flags posts as hate speech or not hate speech. Users complain about unfair flagging, and human reviewers spend extra time interpreting decisions. Their system also performs poorly in other languages. They're exploring Generative AI and LLMs because these can understand context, sarcasm, and nuance in multiple languages, explain reasoning in natural language, suggest better moderation responses, and continuously improve through feedback loops.
+Actors: No actors are needed for this scenario.
+
+A suitable response could be:
+"screens": [
+    {
+      "screen_number": 1,
+      "image_description": "A dynamic split-screen showing a young user sitting at a café posting on safeChats from their phone, with the background illustrating global connectivity through soft glowing world map lines. On the other side, a diverse team of content moderators works in a bright office, reviewing posts on their monitors. The mood is active and global, rendered in a clean flat-vector style with warm blues and yellows.",
+      "caption": "safeChats is a fast-growing social media platform, having active users everyday around the world and users posts in multiple languages. The Trust and Safety team of safeChats wants to strengthen their content moderation system and reduce moderation costs."
+    },
+    {
+      "screen_number": 2,
+      "image_description": "A computer dashboard interface displaying flagged posts with only two labels visible: 'hate speech' or 'not hate speech'. The moderators observe the screen, appearing slightly puzzled by the lack of context. The visuals emphasize simplicity and monotony, showing uniform posts on the dashboard. The scene is illustrated in a cool-toned flat style to highlight technological limitation.",
+      "caption": "safeChats currently uses a traditional sentiment analysis model that flags posts as either hate speech or not hate speech."
+    },
+    {
+      "screen_number": 3,
+      "image_description": "Inside the moderation center, a content moderator reviews posts written in multiple languages on multiple monitors. The moderator takes handwritten notes and highlights unclear posts with sticky notes while frowning in concentration. The lighting is dimmer, symbolizing effort and cognitive load. The visual style remains flat and professional, using muted greys and blues.",
+      "caption": "While this approach helps identify harmful content in English, moderators face a serious challenge — the system provides no explanation for its decisions and cannot support the growing marketplace of the platform in multiple countries."
+    },
+    {
+      "screen_number": 4,
+      "image_description": "Three moderators sit together at a long desk filled with screens showing flagged posts. One moderator leans back, another rubs their forehead, and a third scrolls through endless messages. The atmosphere is tense and slightly fatigued, with soft overhead lighting. The visual emphasizes the emotional burden of unclear decisions in a realistic office setting.",
+      "caption": "Without clear reasoning and multi-language support, human reviewers must spend extra time interpreting why a post was flagged and determining whether the classification was fair or contextually accurate."
+    },
+    {
+      "screen_number": 5,
+      "image_description": "A conference room scene featuring the Head of Content Moderation, AI engineers, and senior leaders gathered around a digital whiteboard showing conceptual AI architecture. Laptops and holographic visuals are on the table. The lighting is bright and forward-looking, symbolizing innovation. The color palette includes optimistic shades of teal and gold.",
+      "caption": "To improve both speed and transparency, safeChats is exploring the potential of Generative AI (GenAI) and Large Language Models (LLMs)."
+    },
+    {
+      "screen_number": 6,
+      "image_description": "A side-by-side comparison of two digital interfaces: on the left, a basic model incorrectly flags a post for containing the word 'destroyed'; on the right, a modern AI interface shows contextual understanding, displaying a visual of balanced speech bubbles and multilingual cues. The scene conveys accuracy and intelligence, using clean, illustrative graphics without text or labels.",
+      "caption": "Unlike standard classifiers, LLMs can understand context, sarcasm, and nuance in multiple languages, explain their reasoning in natural language, and suggest better moderation responses such as rephrasing or issuing a warning."
+    },
+    {
+      "screen_number": 7,
+      "image_description": "A bright office with moderators smiling as they interact with a transparent, AI-assisted moderation dashboard. The central screen displays visuals of global communication and safety icons. The environment feels calm and empowered, with green and light blue hues symbolizing trust and progress.",
+      "caption": "By leveraging feedback loops and fine-tuning, safeChats aims to build a smarter, more transparent moderation system — one that empowers human moderators and keeps online conversations safe."
+    }
+  ]
+
+Generate screen content in valid JSON format and respond with a single JSON object with a "screens" array."""
+
+# Per-request part of the screen generation prompt
+SCREENS_PROMPT = """Create {num_screens} sequential screens for the scenario below.
+
+**Learning Objective:** {key_concept}
+
+**Scenario:**
+{final_scenario}
+
+**Actors:**
+{actors_str}
+
+**Course:** {course_title}
+**Module:** {module_title}
+"""
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _summaries_completion(prompt_hash, nonce, _prompt):
+    """
+    Request the scenario summaries from GPT, cached on the prompt digest.
+    nonce is empty until a session asks for new options, so only that session misses the cache.
+    """
+    response = _openai_client().chat.completions.create(
+        model="gpt-4-1106-preview",  # GPT-4.1 model
+        messages=[
+            {"role": "system", "content": "You are a helpful assistant that follows the provided task instructions carefully."},
+            {"role": "user", "content": _prompt},
+        ],
+        max_tokens=800,
+        temperature=0.7
+    )
+    return response.choices[0].message.content
+
+
+def generate_scenario_summaries_with_gpt(form_data, existing_scenario_data):
+    """
+    Generate three short scenario summaries using GPT-4.1 based on form data and existing scenario data.
+    """
+    try:
+        # Flatten the form fields used by the prompt in a single pass
+        course = form_data.get("course", {})
+        project = form_data.get("project", {})
+        audience = form_data.get("audience", {})
+        values = {
+            "course_title": course.get("course_title", ""),
+            "course_description": course.get("course_description", ""),
+            "module_title": project.get("module_title", ""),
+            "key_concept": project.get("key_concept", ""),
+            "existing_challenge": project.get("existing_challenge", ""),
+            "professional_domain": audience.get("professional_domain", ""),
+            "additional_info": form_data.get("additional_info", ""),
+        }
         
-        # Call GPT-4.1
-        response = client.chat.completions.create(
-            model="gpt-4-1106-preview",  # GPT-4.1 model
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that follows the provided task instructions carefully."},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=800,
-            temperature=0.7
-        )
+        # Create the prompt for GPT-4.1
+        prompt = SCENARIO_SUMMARIES_PROMPT.format_map(values)
+
+        # Call GPT-4.1; unchanged inputs are answered from the cache
+        prompt_hash = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+        content = _summaries_completion(prompt_hash, st.session_state.get("summaries_nonce", ""), prompt)
         
         # Parse the response
-        content = response.choices[0].message.content
         
         # Extract the three scenarios
         scenarios = []
@@ -242,10 +883,11 @@ safeChats is a fast-growing social media platform with active users worldwide. T
         
         for line in lines:
             line = line.strip()
-            if line.startswith("SCENARIO 1:") or line.startswith("SCENARIO 2:") or line.startswith("SCENARIO 3:"):
+            match = SCENARIO_LABEL_RE.match(line)
+            if match:
                 if current_scenario:
                     scenarios.append(current_scenario.strip())
-                current_scenario = line.replace("SCENARIO 1:", "").replace("SCENARIO 2:", "").replace("SCENARIO 3:", "").strip()
+                current_scenario = line[match.end():].strip()
             elif current_scenario and line:
                 current_scenario += " " + line
         
@@ -275,6 +917,7 @@ def step_initial_selection():
     # Reset form data when returning to initial selection
     if st.session_state.workflow_mode is None or st.session_state.current_step == 0:
         st.session_state.form_data = get_default_form_data()
+        mark_form_data_changed()
     
     # Check for existing courses
     existing_courses = get_existing_courses()
@@ -286,6 +929,7 @@ def step_initial_selection():
         if st.button("Create New Project", type="primary", use_container_width=True):
             st.session_state.workflow_mode = "new"
             st.session_state.form_data = get_default_form_data()
+            mark_form_data_changed()
             st.session_state.current_step = 1
             st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
@@ -296,6 +940,7 @@ def step_initial_selection():
             if st.button("Use Existing Content", type="primary", use_container_width=True):
                 st.session_state.workflow_mode = "existing"
                 st.session_state.form_data = get_default_form_data()
+                mark_form_data_changed()
                 st.session_state.current_step = 0.5  # Special step for existing content selection
                 st.rerun()
         else:
@@ -306,16 +951,19 @@ def step_initial_selection():
     # Show existing courses if any
     if existing_courses:
         st.markdown("---")
-        st.subheader("📁 Existing Courses")
+        header_col, refresh_col = st.columns([4, 1])
+        with header_col:
+            st.subheader("📁 Existing Courses")
+        with refresh_col:
+            # Listings are cached for a short while; pick up folders added outside the app now
+            st.button("🔄 Refresh", key="refresh_courses", on_click=clear_existing_content_cache)
         st.markdown("Found the following existing courses:")
         
-        for course in existing_courses:
-            modules = get_existing_modules(course)
+        for course, modules in get_course_module_map().items():
             with st.expander(f" {course} ({len(modules)} modules)"):
                 if modules:
-                    st.markdown("**Existing modules:**")
-                    for module in modules:
-                        st.markdown(f"  • {module}")
+                    # One element per course rather than one per module
+                    st.markdown("**Existing modules:**\n\n" + "\n".join(f"- {module}" for module in modules))
                 else:
                     st.markdown("No modules found for this course.")
 
@@ -331,6 +979,7 @@ def step_existing_content_selection():
         if st.button("← Back to Selection"):
             st.session_state.workflow_mode = None
             st.session_state.form_data = get_default_form_data()
+            mark_form_data_changed()
             st.session_state.current_step = 0
             st.rerun()
         return
@@ -345,19 +994,13 @@ def step_existing_content_selection():
         # Clear module whenever course changes
         st.session_state.selected_module = None
 
-    st.subheader("Course Selection")
-
-    st.markdown("""
-    <style>
-    /* Hide the search input inside the new Selectbox widget */
-    .stSelectbox [data-baseweb="select"] input {
-        opacity: 0 !important;         /* Hide text */
-        height: 0 !important;          /* Collapse visible height */
-        padding: 0 !important;
-        margin: 0 !important;
-        border: none !important;
-    }</style>
-    """, unsafe_allow_html=True)
+    course_header_col, refresh_col = st.columns([4, 1])
+    with course_header_col:
+        st.subheader("Course Selection")
+    with refresh_col:
+        st.button("🔄 Refresh", key="refresh_existing_content", on_click=clear_existing_content_cache)
+
+    st.markdown(SELECTBOX_NO_SEARCH_CSS, unsafe_allow_html=True)
     # Single key, no manual assignment after rendering
     st.selectbox(
         "Select Course",
@@ -394,6 +1037,7 @@ def step_existing_content_selection():
         if st.button("← Back to Selection", type="secondary"):
             st.session_state.workflow_mode = None
             st.session_state.form_data = get_default_form_data()
+            mark_form_data_changed()
             st.session_state.current_step = 0
             st.rerun()
         
@@ -403,69 +1047,80 @@ def step_existing_content_selection():
                 st.error("Please select a module to continue.")
                 return
             
-            course_name_clean = st.session_state.selected_course.lower().replace(' ', '_')
-            module_name_clean = st.session_state.selected_module.lower().replace(' ', '_')
-            base_path = os.path.join("data", course_name_clean, module_name_clean, "text_outputs")
+            module_path = get_module_path(st.session_state.selected_course, st.session_state.selected_module)
+            base_path = os.path.join(module_path, "text_outputs")
             config_path = os.path.join(base_path, "context.json")
 
-            if os.path.exists(config_path):
+            # Parsed once per file modification; empty when the module has no context.json
+            existing_data = {}
+            load_error = None
+            try:
+                existing_data = load_scenario_data(config_path)
+            except Exception as e:
+                load_error = e
+
+            if existing_data:
                 try:
-                    with open(config_path, 'r') as f:
-                        existing_data = json.load(f)
                     st.session_state.form_data = existing_data
+                    mark_form_data_changed()
                     st.session_state.workflow_mode = "existing_module"
                     
-                    # Detect last completed step based on files
-                    scenario_desc_path = os.path.join(base_path, "scenario_descriptions.json")
-                    metadata_path = os.path.join(base_path, "scenario_metadata.json")
-                    screens_path = os.path.join(base_path, "screens.json")
-                    images_path = os.path.join(base_path, "generated_images.json")
-                    composited_path = os.path.join(base_path, "composited_screens")
+                    # Detect last completed step based on files, from a single directory read
+                    with os.scandir(base_path) as it:
+                        entries = {entry.name: entry for entry in it}
+                    composited_entry = entries.get("composited_screens")
+                    has_composited = False
+                    if composited_entry and composited_entry.is_dir():
+                        with os.scandir(composited_entry.path) as it:
+                            has_composited = any(it)
                     
-                    if os.path.exists(composited_path) and os.path.isdir(composited_path) and os.listdir(composited_path):
+                    if has_composited:
                         target_step = 7
-                    elif os.path.exists(images_path):
+                    elif "generated_images.json" in entries:
                         target_step = 6
-                    elif os.path.exists(screens_path):
+                    elif "screens.json" in entries:
                         target_step = 5
-                    elif os.path.exists(metadata_path):
+                    elif "scenario_metadata.json" in entries:
                         target_step = 4
-                    elif os.path.exists(scenario_desc_path):
+                    elif "scenario_descriptions.json" in entries:
                         target_step = 3
                     else:
                         target_step = 2
                     
-                    # Load existing data for the detected step
-                    if target_step >= 3 and os.path.exists(scenario_desc_path):
-                        with open(scenario_desc_path, 'r') as f:
-                            scenario_data = json.load(f)
-                            if "scenario_data" not in st.session_state:
-                                st.session_state.scenario_data = {}
-                            st.session_state.scenario_data["final_scenario"] = scenario_data.get("scenario_description", "")
-                            st.session_state.scenarios_need_generation = False
+                    # Load existing data for the detected step, reading the files concurrently
+                    loaders = [(name, loader) for name, loader in RESUME_LOADERS if name in entries]
+                    loaded = {}
+                    if loaders:
+                        with ThreadPoolExecutor(max_workers=len(loaders)) as executor:
+                            futures = [
+                                (name, executor.submit(loader, os.path.join(base_path, name)))
+                                for name, loader in loaders
+                            ]
+                        loaded = {name: future.result() for name, future in futures}
+
+                    if "scenario_descriptions.json" in loaded:
+                        st.session_state.setdefault("scenario_data", {})["final_scenario"] = loaded["scenario_descriptions.json"].get("scenario_description", "")
+                        st.session_state.scenarios_need_generation = False
                     
-                    if target_step >= 4 and os.path.exists(metadata_path):
-                        with open(metadata_path, 'r') as f:
-                            st.session_state.metadata_data = json.load(f)
-                            st.session_state.metadata_need_generation = False
+                    if "scenario_metadata.json" in loaded:
+                        st.session_state.metadata_data = loaded["scenario_metadata.json"]
+                        st.session_state.metadata_need_generation = False
                     
-                    if target_step >= 5 and os.path.exists(screens_path):
-                        with open(screens_path, 'r') as f:
-                            st.session_state.screen_data = json.load(f)
-                            st.session_state.screens_need_generation = False
+                    if "screens.json" in loaded:
+                        st.session_state.screen_data = loaded["screens.json"]
+                        st.session_state.screens_need_generation = False
+                        mark_screen_data_changed()
                     
                     if target_step >= 6:
-                        if os.path.exists(images_path):
-                            with open(images_path, 'r') as f:
-                                st.session_state.generated_images = json.load(f)
-                        else:
-                            st.session_state.generated_images = []
+                        st.session_state.generated_images = loaded.get("generated_images.json", [])
                     
                     st.session_state.current_step = target_step
                     _clear_sidebar_keys()
                     st.rerun()
                 except Exception as e:
                     st.error(f" Could not load existing configuration: {str(e)}")
+            elif load_error is not None:
+                st.error(f" Could not load existing configuration: {str(load_error)}")
             else:
                 st.error(" No existing configuration found for this module. Please create a new project instead.")
 
@@ -475,24 +1130,29 @@ def step_project_setup():
     
     st.markdown('<div class="step-description">Let\'s set up your project with the essential information.</div>', unsafe_allow_html=True)
     
+    form_data = st.session_state.form_data
+    course = form_data["course"]
+    project = form_data["project"]
+    audience = form_data["audience"]
+
     with st.form("project_setup_form"):
         course_title = st.text_input(
             "What course or program is the scenario generation for?",
-            value=st.session_state.form_data["course"].get("course_title", ""),
+            value=course.get("course_title", ""),
             help="So the scenario fits the subject and level of your learners.",
             placeholder="Enter the course or program name, e.g., Introduction to Data Analysis, Strategic Leadership"
         )
         
         professional_domain = st.text_input(
             "What is the learner's professional domain?",
-            value=st.session_state.form_data["audience"].get("professional_domain", ""),
+            value=audience.get("professional_domain", ""),
             help="This helps shape the tone and professional context of the scenario.",
             placeholder="e.g., Marketing professionals, Social media managers, Data analysts"
         )
         
         course_description = st.text_area(
             "What is a high-level course description?",
-            value=st.session_state.form_data["course"].get("course_description", ""),
+            value=course.get("course_description", ""),
             help="Provide context about what the course covers overall.",
             placeholder="e.g., This course teaches students how to use AI tools for content moderation...",
             height=100
@@ -500,14 +1160,14 @@ def step_project_setup():
         
         module_title = st.text_input(
             "Which topic or module should the scenario focus on?",
-            value=st.session_state.form_data["project"].get("module_title", ""),
+            value=project.get("module_title", ""),
             help="So the scenario stays aligned with what learners are currently studying.",
             placeholder="Write the topic or module name, e.g., Ethical Decision-Making, Data Visualization"
         )
         
         key_concept = st.text_area(
             "What is the key concept or learning objective that the scenario should highlight?",
-            value=st.session_state.form_data["project"].get("key_concept", ""),
+            value=project.get("key_concept", ""),
             help="This becomes the main idea or concept the scenario brings to life.",
             placeholder="List one or two key ideas, e.g., analyzing information to make a decision",
             height=100
@@ -515,7 +1175,7 @@ def step_project_setup():
         
         existing_challenge = st.text_area(
             "What do the learners already know about this topic?",
-            value=st.session_state.form_data["project"].get("existing_challenge", ""),
+            value=project.get("existing_challenge", ""),
             help="This helps set the right level of challenge.",
             placeholder="Mention what learners already understand, e.g., they know basic tools",
             height=100
@@ -525,24 +1185,25 @@ def step_project_setup():
         
         if submitted:
             if all([course_title, professional_domain, course_description, module_title, key_concept, existing_challenge]):
-                st.session_state.form_data["course"] = {
+                form_data["course"] = {
                     "course_title": course_title,
                     "course_description": course_description,
-                    "course_objectives": st.session_state.form_data["course"].get("course_objectives", "")
+                    "course_objectives": course.get("course_objectives", "")
                 }
-                st.session_state.form_data["project"] = {
+                form_data["project"] = {
                     "module_title": module_title,
-                    "module_description": st.session_state.form_data["project"].get("module_description", ""),
+                    "module_description": project.get("module_description", ""),
                     "key_concept": key_concept,
                     "existing_challenge": existing_challenge,
-                    "project_learning_objectives": st.session_state.form_data["project"].get("project_learning_objectives", "")
+                    "project_learning_objectives": project.get("project_learning_objectives", "")
                 }
-                st.session_state.form_data["audience"] = {
+                form_data["audience"] = {
                     "professional_domain": professional_domain,
-                    "education_level": st.session_state.form_data["audience"].get("education_level", "undergrad_intro"),
-                    "prerequisites": st.session_state.form_data["audience"].get("prerequisites", ""),
-                    "class_size": st.session_state.form_data["audience"].get("class_size", 25)
+                    "education_level": audience.get("education_level", "undergrad_intro"),
+                    "prerequisites": audience.get("prerequisites", ""),
+                    "class_size": audience.get("class_size", 25)
                 }
+                mark_form_data_changed()
                 # Clear modal widget keys to force them to sync with updated form_data
                 _clear_sidebar_keys()
                 st.session_state.current_step = 2
@@ -552,35 +1213,22 @@ def step_project_setup():
 
 def step_review_export():
     """Step 2: Review and Save Configuration"""
-    # Clear modal keys to ensure sidebar widgets sync with form_data
-    _clear_sidebar_keys()
+    # Clear modal keys to ensure sidebar widgets sync with form_data, only once per change
+    _clear_sidebar_keys(only_if_stale=True)
     
     st.markdown('<div class="step-header">Review & Save Configuration</div>', unsafe_allow_html=True)
     st.markdown('<div class="step-description">Review your information and save the configuration. Next, you\'ll generate AI-powered scenario descriptions for your project.</div>', unsafe_allow_html=True)
     
-    # Display all collected information
-    st.subheader(" Course Information")
-    course_data = st.session_state.form_data["course"]
-    st.markdown(f"**Course/Program:** {course_data.get('course_title', 'Not provided')}")
-    if course_data.get('course_objectives'):
-        st.markdown(f"**Course Objectives:** {course_data.get('course_objectives', 'Not provided')}")
-    
-    st.subheader(" Module & Learning Information")
-    project_data = st.session_state.form_data["project"]
-    st.markdown(f"**Module/Topic:** {project_data.get('module_title', 'Not provided')}")
-    if project_data.get('module_description'):
-        st.markdown(f"**Module Description:** {project_data.get('module_description', 'Not provided')}")
-    st.markdown(f"**Key Concept:** {project_data.get('key_concept', 'Not provided')}")
-    st.markdown(f"**Existing Challenge:** {project_data.get('existing_challenge', 'Not provided')}")
-    if project_data.get('project_learning_objectives'):
-        st.markdown(f"**Learning Objectives:** {project_data.get('project_learning_objectives', 'Not provided')}")
-    
-    st.subheader("Audience")
-    audience_data = st.session_state.form_data["audience"]
-    st.markdown(f"**Professional Domain:** {audience_data.get('professional_domain', 'Not provided')}")
-    
-    st.subheader(" Course Description")
-    st.markdown(f"**Description:** {course_data.get('course_description', 'Not provided')}")
+    # Display all collected information, one markdown element per section
+    form_data = st.session_state.form_data
+    for title, section, fields in REVIEW_SECTIONS:
+        st.subheader(title)
+        data = form_data[section]
+        st.markdown("\n\n".join(
+            f"**{label}:** {data.get(field, 'Not provided')}"
+            for label, field, optional in fields
+            if not optional or data.get(field)
+        ))
     
     col1, col2, col3 = st.columns(3)
     
@@ -599,6 +1247,7 @@ def step_review_export():
                 # Move directly to scenario generation
                 st.session_state.current_step = 3
                 st.session_state.scenarios_need_generation = True
+                st.session_state.scenario_loaded = False
                 st.rerun()
             except Exception as e:
                 st.error(f" Error saving configuration: {str(e)}")
@@ -608,12 +1257,22 @@ def step_review_export():
             st.session_state.current_step = 0
             st.session_state.workflow_mode = None
             st.session_state.form_data = get_default_form_data()
+            mark_form_data_changed()
             st.rerun()
     
     # Display JSON preview
     # st.subheader("📄 Configuration Preview")
     # st.json(st.session_state.form_data)
 
+
+def _select_scenario(index):
+    """Button callback: make generated option index the selected and final scenario"""
+    scenarios = st.session_state.scenario_data.get("generated_scenarios", [])
+    st.session_state.scenario_data["selected_scenario"] = index
+    st.session_state.scenario_data["final_scenario"] = scenarios[index] if len(scenarios) > index else ""
+    _clear_sidebar_keys()
+
+
 def step_scenario_generation():
     """Step 3: Generate Scenario Description and Image Vibe"""
     # st.markdown('<div class="step-header">Scenario Generation</div>', unsafe_allow_html=True)
@@ -622,9 +1281,13 @@ def step_scenario_generation():
     # Clear sidebar keys to ensure widgets sync with latest data
     _clear_sidebar_keys()
     
-    # Check if scenario data already exists
+    # Check if scenario data already exists; once it has been taken into the
+    # session there is no need to read the file again on every rerun
     scenario_filepath = get_scenario_filepath(st.session_state.form_data)
-    existing_scenario_data = load_scenario_data(scenario_filepath)
+    if st.session_state.get("scenario_loaded"):
+        existing_scenario_data = st.session_state.scenario_data
+    else:
+        existing_scenario_data = load_scenario_data(scenario_filepath)
     
     # Check for existing scenario and offer to use it
     if existing_scenario_data and existing_scenario_data.get("final_scenario") and "scenarios_need_generation" not in st.session_state:
@@ -646,14 +1309,14 @@ def step_scenario_generation():
         return
     
     # Initialize scenario data if not exists
-    if not hasattr(st.session_state, 'scenario_data') or not st.session_state.scenario_data:
+    if not st.session_state.get("scenario_data"):
         st.session_state.scenario_data = existing_scenario_data or {}
         if existing_scenario_data:
             _clear_sidebar_keys()
+    st.session_state.scenario_loaded = True
     
     # Initialize generation flag if not exists
-    if "scenarios_need_generation" not in st.session_state:
-        st.session_state.scenarios_need_generation = True
+    st.session_state.setdefault("scenarios_need_generation", True)
     
     # Only generate new scenarios when flag is True
     if st.session_state.scenarios_need_generation:
@@ -675,35 +1338,17 @@ def step_scenario_generation():
     scenarios = st.session_state.scenario_data.get("generated_scenarios", [])
     selected_scenario = st.session_state.scenario_data.get("selected_scenario", None)
     
-    # Display scenarios in columns
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        # st.markdown("**Scenario Option 1**")
-        if st.button("Select Option 1", key="select_1", type="primary" if selected_scenario == 0 else "secondary"):
-            st.session_state.scenario_data["selected_scenario"] = 0
-            st.session_state.scenario_data["final_scenario"] = scenarios[0] if len(scenarios) > 0 else ""
-            _clear_sidebar_keys()
-            st.rerun()
-        st.info(scenarios[0] if len(scenarios) > 0 else "No scenario available")
-    
-    with col2:
-        # st.markdown("**Scenario Option 2**")
-        if st.button("Select Option 2", key="select_2", type="primary" if selected_scenario == 1 else "secondary"):
-            st.session_state.scenario_data["selected_scenario"] = 1
-            st.session_state.scenario_data["final_scenario"] = scenarios[1] if len(scenarios) > 1 else ""
-            _clear_sidebar_keys()
-            st.rerun()
-        st.info(scenarios[1] if len(scenarios) > 1 else "No scenario available")
-    
-    with col3:
-        # st.markdown("**Scenario Option 3**")
-        if st.button("Select Option 3", key="select_3", type="primary" if selected_scenario == 2 else "secondary"):
-            st.session_state.scenario_data["selected_scenario"] = 2
-            st.session_state.scenario_data["final_scenario"] = scenarios[2] if len(scenarios) > 2 else ""
-            _clear_sidebar_keys()
-            st.rerun()
-        st.info(scenarios[2] if len(scenarios) > 2 else "No scenario available")
+    # Display scenarios in columns; selection is applied in a callback so the click needs no extra rerun
+    for index, col in enumerate(st.columns(3)):
+        with col:
+            st.button(
+                f"Select Option {index + 1}",
+                key=f"select_{index + 1}",
+                type="primary" if selected_scenario == index else "secondary",
+                on_click=_select_scenario,
+                args=(index,)
+            )
+            st.info(scenarios[index] if len(scenarios) > index else "No scenario available")
     
     # Show selected scenario and allow editing
     if selected_scenario is not None:
@@ -740,51 +1385,22 @@ def step_scenario_generation():
             if update_instructions:
                 with st.spinner("🤖 Updating scenario with AI..."):
                     try:  
-                        course_title = st.session_state.form_data["course"].get("course_title", "")
-                        course_description = st.session_state.form_data["course"].get("course_description", "")
-                        professional_domain = st.session_state.form_data["audience"].get("professional_domain", "")
-                        module_title = st.session_state.form_data["project"].get("module_title", "")
-                        key_concept = st.session_state.form_data["project"].get("key_concept", "")
-                        existing_challenge = st.session_state.form_data["project"].get("existing_challenge", "")
-                        additional_info = st.session_state.form_data.get("additional_info", "")
-                        prompt = f"""
-You are an expert instructional designer and learning experience designer who creates short, realistic, and motivating learning scenarios for higher education and professional audiences. Each scenario should connect the key concept to real-world practice, reflect the learners' context, and feel authentic to their field.
-
-Based on the following inputs, update the current scenario according to the update instructions:
-Current scenario: {edited_scenario}
-Update instructions: {update_instructions}
-
-Inputs:
-- Course: {course_title}
-- Course Description: {course_description}
-- Professional Domain: {professional_domain}
-- Module Description: {module_title}
-- Key Concept or Learning Objective: {key_concept}
-- Learners' Existing Knowledge: {existing_challenge}
-- Additional Information: {additional_info}
-
-Scenarios should
-1. Be **realistic and relevant** to the learner profile and course context.
-2. Clearly illustrate **how the key concept or skill applies in practice**.
-3. Present a situation or challenge that encourages **critical thinking or decision-making**.
-4. Use **authentic, inclusive examples** (diverse names, roles, and settings).
-5. Specify a **clear setting or context** (e.g., workplace, community, field site, research team, or organizational meeting).
-6. Feel **motivating and purposeful** — learners should understand why the skill or concept matters.
-7. Be 2-3 sentences long. Do not add any other text or formatting.
-
-**IMPORTANT: Each scenario must:**
-- Write in plain, professional language suitable for higher education or adult learners.
-- Keep tone **practical, motivational, and grounded in real-world settings**.
-- Avoid jargon or overly academic phrasing.
-- Focus on what’s happening and why it matters — not on lengthy backstories or character details.
-
-**CRITICAL:** Your response must contain ONLY the scenario text. No prefixes, no labels, no metadata, no explanations - just the scenario itself.
-
-Example of correct format:
-safeChats is a fast-growing social media platform with active users worldwide. Their Trust and Safety team needs help strengthening content moderation systems and reducing costs. Currently, they use traditional sentiment analysis that flags posts as hate speech or not, but provides no explanations. Users complain about unfair flagging, and human reviewers spend extra time interpreting decisions. Their system also performs poorly in other languages. They're exploring Generative AI and LLMs because these can understand context, sarcasm, and nuance in multiple languages, explain reasoning in natural language, suggest better moderation responses, and continuously improve through feedback loops.
-"""
-                        client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-                        response = client.chat.completions.create(
+                        form_data = st.session_state.form_data
+                        prompt = SCENARIO_UPDATE_PROMPT.format_map({
+                            "edited_scenario": edited_scenario,
+                            "update_instructions": update_instructions,
+                            "course_title": form_data["course"].get("course_title", ""),
+                            "course_description": form_data["course"].get("course_description", ""),
+                            "professional_domain": form_data["audience"].get("professional_domain", ""),
+                            "module_title": form_data["project"].get("module_title", ""),
+                            "key_concept": form_data["project"].get("key_concept", ""),
+                            "existing_challenge": form_data["project"].get("existing_challenge", ""),
+                            "additional_info": form_data.get("additional_info", ""),
+                        })
+                        client = _openai_client()
+                        content = _stream_completion(
+                            client,
+                            st.empty(),
                             model="gpt-4-1106-preview",  # GPT-4.1 model
                             messages=[
                                 {"role": "system", "content": "You are a helpful assistant that follows the provided task instructions carefully."},
@@ -793,7 +1409,7 @@ safeChats is a fast-growing social media platform with active users worldwide. T
                             max_tokens=800,
                             temperature=0.7
                         )
-                        updated_scenario = response.choices[0].message.content.strip()
+                        updated_scenario = content.strip()
                         st.session_state.scenario_data["generated_scenarios"][selected_scenario] = updated_scenario
                         st.session_state.scenario_data["final_scenario"] = updated_scenario
                         if "edit_scenario" in st.session_state:
@@ -831,14 +1447,8 @@ safeChats is a fast-growing social media platform with active users worldwide. T
                     save_scenario_data(st.session_state.scenario_data, scenario_filepath)
                     
                     # Also save to scenario_descriptions.json
-                    course_title = st.session_state.form_data["course"].get("course_title", "")
-                    module_title = st.session_state.form_data["project"].get("module_title", "")
-                    course_name = "".join(c for c in course_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-                    module_name = "".join(c for c in module_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-                    desc_filepath = f"data/{course_name}/{module_name}/text_outputs/scenario_descriptions.json"
-                    os.makedirs(os.path.dirname(desc_filepath), exist_ok=True)
-                    with open(desc_filepath, 'w') as f:
-                        json.dump({"scenario_description": edited_scenario}, f, indent=2)
+                    desc_filepath = _project_paths()["scenario"]
+                    save_scenario_data({"scenario_description": edited_scenario}, desc_filepath)
                     
                     st.success(" Scenario saved successfully!")
                     st.session_state.current_step = 4
@@ -857,6 +1467,10 @@ safeChats is a fast-growing social media platform with active users worldwide. T
                 st.session_state.scenario_data.pop("selected_scenario", None)
                 st.session_state.scenario_data.pop("final_scenario", None)
             st.session_state.scenarios_need_generation = True
+            st.session_state.scenario_loaded = False
+            # Ask GPT again rather than replaying the cached options; the cache is
+            # shared by all sessions, so this session moves to a fresh cache key
+            st.session_state.summaries_nonce = os.urandom(8).hex()
             st.rerun()
 
 
@@ -869,29 +1483,23 @@ def step_scenario_metadata():
     st.markdown('<div class="step-description">Generate metadata and actors for your scenario using AI.</div>', unsafe_allow_html=True)
     
     # Initialize metadata generation flag
-    if "metadata_need_generation" not in st.session_state:
-        st.session_state.metadata_need_generation = True
+    st.session_state.setdefault("metadata_need_generation", True)
     
     # Get final scenario
     final_scenario = st.session_state.scenario_data.get("final_scenario", "")
     
     # Check for existing metadata
-    course_title = st.session_state.form_data["course"].get("course_title", "")
-    module_title = st.session_state.form_data["project"].get("module_title", "")
-    course_name = "".join(c for c in course_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-    module_name = "".join(c for c in module_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-    metadata_filepath = f"data/{course_name}/{module_name}/text_outputs/scenario_metadata.json"
+    metadata_filepath = _project_paths()["metadata"]
     
+    # Parsed once per file modification rather than on every rerun
     existing_metadata = None
-    if os.path.exists(metadata_filepath):
-        try:
-            with open(metadata_filepath, 'r') as f:
-                existing_metadata = json.load(f)
-        except:
-            pass
+    try:
+        existing_metadata = load_scenario_data(metadata_filepath) or None
+    except Exception:
+        pass
     
     # Initialize metadata data if not exists
-    if "metadata_data" not in st.session_state or not st.session_state.metadata_data:
+    if not st.session_state.get("metadata_data"):
         st.session_state.metadata_data = existing_metadata or {}
         if existing_metadata:
             _clear_sidebar_keys()
@@ -919,65 +1527,33 @@ def step_scenario_metadata():
     if st.session_state.metadata_need_generation:
         with st.spinner("Generating scenario metadata with AI..."):
             try:
-                client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+                client = _openai_client()
                 
-                prompt = f"""You are an instructional scenario designer. Based on the scenario description, extract key visual and narrative metadata.
-
-Scenario: {final_scenario}
-
-Course: {st.session_state.form_data["course"].get("course_title", "")}
-Module: {st.session_state.form_data["project"].get("module_title", "")}
-
-Your task:
-1. Determine how many visual screens are needed to convey the scenario effectively (usually between 3 and 7).
-2. Recommend the most suitable aspect ratio for these screens (e.g., 16:9, 9:16, 1:1) based on the learning context.
-3. Identify the main character:
-   - Include name, role or title, and a clear explanation of their *objective* and *decision-making context* in the scenario.
-4. Identify any side or supporting characters (only if they contribute meaningfully to the scenario's progression). There should be either 0 or 1 supporting character:
-   - Include name, role or title, and a concise explanation of how they *interact with or influence the main character's goal*.
-5. For each character, provide a brief visual appearance description to ensure visual consistency across images. IMPORTANT: Characters should be diverse in terms of ethnicity, gender, age, and other characteristics. Avoid stereotypes and ensure representation reflects real-world diversity.
- 
-Output strictly in JSON format:
-{{
-  "num_screens": <integer>,
-  "aspect_ratio": "<string>",
-  "actors": [
-    {{
-      "name": "<string>",
-      "role": "<string>",
-      "purpose": "<describe what they are trying to accomplish and how their actions or perspective drive the scenario forward>",
-      "appearance": "<brief visual description including age, ethnicity, gender, and distinctive features. Ensure diversity>"
-    }},
-    {{
-      "name": "<string>",
-      "role": "<string>",
-      "purpose": "<describe how this supporting character enables, challenges, or informs the main character's decisions>",
-      "appearance": "<brief visual description including age, ethnicity, gender, and distinctive features. Ensure diversity>"
-    }}
-  ]
-}}"""
+                prompt = METADATA_PROMPT.format_map({
+                    "final_scenario": final_scenario,
+                    "course_title": st.session_state.form_data["course"].get("course_title", ""),
+                    "module_title": st.session_state.form_data["project"].get("module_title", ""),
+                })
 
                 
-                response = client.chat.completions.create(
+                content = _stream_completion(
+                    client,
+                    st.empty(),
+                    language="json",
                     model="gpt-4-1106-preview",
                     messages=[
                         {"role": "system", "content": "You are an expert educational content designer. Generate scenario metadata in valid JSON format."},
                         {"role": "user", "content": prompt}
                     ],
                     max_tokens=800,
-                    temperature=0.7
+                    temperature=0.7,
+                    # JSON mode guarantees a single parseable object, so no regex extraction is needed
+                    response_format={"type": "json_object"}
                 )
                 
-                import re
-                content = response.choices[0].message.content
-                json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                if json_match:
-                    metadata = json.loads(json_match.group())
-                    st.session_state.metadata_data = metadata
-                    st.session_state.metadata_need_generation = False
-                    _clear_sidebar_keys()
-                else:
-                    st.error("Failed to parse metadata")
+                st.session_state.metadata_data = orjson.loads(content)
+                st.session_state.metadata_need_generation = False
+                _clear_sidebar_keys()
             except Exception as e:
                 st.error(f" Error generating metadata: {str(e)}")
                 return
@@ -985,53 +1561,42 @@ Output strictly in JSON format:
     # Display and edit actors
     st.subheader("Actors")
     
+    # One table for all actors; rows are added and deleted inside the editor without a rerun
     actors = st.session_state.metadata_data.get("actors", [])
-    if not actors:
-        actors = [{"name": "", "role": "", "purpose": "", "appearance": ""}]
-    
-    edited_actors = []
-    to_delete = None
-
-    for i, actor in enumerate(actors):
-        with st.expander(f"Actor {i+1}: {actor.get('name', 'New Actor')}", expanded=True):
-            cols = st.columns([10, 1.4])
-            with cols[0]:
-                name = st.text_input("Name", value=actor.get("name", ""), key=f"actor_{i}_name")
-                role = st.text_input("Role", value=actor.get("role", ""), key=f"actor_{i}_role")
-                purpose_text = actor.get("purpose", "")
-                appearance_text = actor.get("appearance", "")
-                # Dynamically calculate height based on length of text (minimum 80, max 400 for large entries)
-                purpose_height = min(max(80, int(len(purpose_text) * 1.2) + 40), 125)
-                appearance_height = min(max(80, int(len(appearance_text) * 1.2) + 40), 125)
-                purpose = st.text_area(
-                    "Character's Objective",
-                    value=purpose_text,
-                    key=f"actor_{i}_purpose",
-                    height=purpose_height
-                )
-                appearance = st.text_area("Visual Appearance", value=appearance_text, key=f"actor_{i}_appearance", height=appearance_height, help="Describe appearance including age, ethnicity, gender, distinctive features. Ensure diversity.")
-            with cols[1]:
-                if st.button("Delete", key=f"delete_actor_{i}"):
-                    to_delete = i
-            
-            edited_actors.append({
-                "name": name,
-                "role": role,
-                "purpose": purpose,
-                "appearance": appearance
-            })
-    
-    if to_delete is not None:
-        actors.pop(to_delete)
-        st.session_state.metadata_data["actors"] = actors
-        st.rerun()
-
-    if st.button("Add Actor"):
-        actors.append({"name": "", "role": "", "purpose": "", "appearance": ""})
-        st.session_state.metadata_data["actors"] = actors
-        st.rerun()
+    if actors is not st.session_state.get("_actors_editor_output"):
+        # Actors were generated or loaded: restart the editor from them; with no actors the
+        # table starts empty with its text columns in place rather than with a blank row
+        st.session_state._actors_editor_source = (
+            pd.DataFrame(actors, columns=ACTOR_FIELDS, dtype=object).fillna("").astype(str)
+        )
+        st.session_state._actors_editor_version = st.session_state.get("_actors_editor_version", 0) + 1
+
+    edited_rows = st.data_editor(
+        st.session_state._actors_editor_source,
+        num_rows="dynamic",
+        use_container_width=True,
+        column_order=ACTOR_FIELDS,
+        column_config={
+            "name": st.column_config.TextColumn("Name"),
+            "role": st.column_config.TextColumn("Role"),
+            "purpose": st.column_config.TextColumn("Character's Objective", width="large"),
+            "appearance": st.column_config.TextColumn(
+                "Visual Appearance",
+                width="large",
+                help="Describe appearance including age, ethnicity, gender, distinctive features. Ensure diversity."
+            ),
+        },
+        key=f"actors_editor_{st.session_state._actors_editor_version}"
+    )
+    # Rows added but left blank are dropped so they are never saved as actors
+    edited_actors = [
+        actor
+        for actor in edited_rows.fillna("").astype(str)[ACTOR_FIELDS].to_dict("records")
+        if any(value.strip() for value in actor.values())
+    ]
     
     st.session_state.metadata_data["actors"] = edited_actors
+    st.session_state._actors_editor_output = edited_actors
 
     
     # Display and edit metadata
@@ -1081,14 +1646,8 @@ Output strictly in JSON format:
                 _clear_sidebar_keys()
                 
                 # Save to file
-                course_title = st.session_state.form_data["course"].get("course_title", "")
-                module_title = st.session_state.form_data["project"].get("module_title", "")
-                course_name = "".join(c for c in course_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-                module_name = "".join(c for c in module_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-                metadata_filepath = f"data/{course_name}/{module_name}/text_outputs/scenario_metadata.json"
-                os.makedirs(os.path.dirname(metadata_filepath), exist_ok=True)
-                with open(metadata_filepath, 'w') as f:
-                    json.dump(st.session_state.metadata_data, f, indent=2)
+                metadata_filepath = _project_paths()["metadata"]
+                save_scenario_data(st.session_state.metadata_data, metadata_filepath)
                 
                 st.success("Metadata saved successfully!")
                 st.session_state.current_step = 5
@@ -1103,6 +1662,20 @@ Output strictly in JSON format:
             st.rerun()
 
 
+def _apply_screen_edit(index, field, key):
+    """Widget callback: copy an edited screen field into the screen data"""
+    st.session_state.screen_data["screens"][index][field] = st.session_state[key]
+    st.session_state._screens_dirty = True
+
+
+def _apply_screen_form():
+    """Form submit callback: copy every edited caption and image description into the screen data"""
+    version = st.session_state.get("screen_data_version", 0)
+    for i, screen in enumerate(st.session_state.screen_data.get("screens", [])):
+        screen["caption"] = st.session_state[f"screen_{version}_{i}_caption"]
+        screen["image_description"] = st.session_state[f"screen_{version}_{i}_img"]
+
+
 def step_screen_generation():
     """Step 5: Generate Screens with Image Descriptions and Captions"""
     # Clear sidebar keys to ensure widgets sync with latest data
@@ -1112,29 +1685,23 @@ def step_screen_generation():
     st.markdown('<div class="step-description">Generate screens with image descriptions and captions for your scenario.</div>', unsafe_allow_html=True)
     
     # Get necessary data for file paths
-    course_title = st.session_state.form_data["course"].get("course_title", "")
-    module_title = st.session_state.form_data["project"].get("module_title", "")
-    course_name = "".join(c for c in course_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-    module_name = "".join(c for c in module_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-    screens_filepath = f"data/{course_name}/{module_name}/text_outputs/screens.json"
+    screens_filepath = _project_paths()["screens"]
     
-    # Check for existing screen data
+    # Check for existing screen data; parsed once per file modification rather than on every rerun
     existing_screen_data = None
-    if os.path.exists(screens_filepath):
-        try:
-            with open(screens_filepath, 'r') as f:
-                existing_screen_data = json.load(f)
-        except:
-            pass
+    try:
+        existing_screen_data = load_scenario_data(screens_filepath) or None
+    except Exception:
+        pass
     
     # Initialize screen generation flag
-    if "screens_need_generation" not in st.session_state:
-        st.session_state.screens_need_generation = True
+    st.session_state.setdefault("screens_need_generation", True)
     
     # Initialize screen data if not exists
-    if "screen_data" not in st.session_state or not st.session_state.screen_data:
+    if not st.session_state.get("screen_data"):
         st.session_state.screen_data = existing_screen_data or {}
         if existing_screen_data:
+            mark_screen_data_changed()
             _clear_sidebar_keys()
     
     # Get necessary data
@@ -1146,147 +1713,83 @@ def step_screen_generation():
     if st.session_state.screens_need_generation:
         with st.spinner("🤖 Generating screens with AI..."):
             try:
-                client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+                client = _openai_client()
                 
                 actors_str = "\n".join([f"- {a['name']} ({a['role']}): {a['purpose']}" for a in actors])
-                key_concept = st.session_state.form_data["project"].get("key_concept", "")
+                course = st.session_state.form_data["course"]
+                project = st.session_state.form_data["project"]
                 
-                prompt = f"""
-You are an expert instructional designer and learning experience designer who creates short, realistic, and motivating learning scenarios for higher education and professional audiences. Each scenario should connect the key concept to real-world practice, reflect the learners' context, and feel authentic to their field.                
-
-**Goal:** Create {num_screens} sequential screens that visually tell the story described below. The PRIMARY focus should be on clearly depicting and reinforcing the learning objective: {key_concept}. Each screen should directly connect to how this concept is applied, learned, or demonstrated in the scenario.
-
-**Story Arc:**  
-Follow the traditional story structure of:
-1. **Beginning** – Introduce the context, characters, and the inciting incident that sets the story in motion.  
-2. **Rising Action** – Build tension or challenge as the main event or conflict unfolds.  
-3. **Climax** – Present the turning point or key decision moment.  
-4. **Falling Action** – Show the outcome or consequence of that moment.  
-5. **Resolution** – End with an insight, learning, or call to action that ties back to the learning goal.
-
-**Scenario:**  
-{final_scenario}
-
-**Actors:**  
-{actors_str}
-
-**Course:** {st.session_state.form_data["course"].get("course_title", "")}  
-**Module:** {st.session_state.form_data["project"].get("module_title", "")}
-
-**Guidelines:**
-1. Each screen should advance the story in a logical and emotionally engaging way, aligned with the storytelling arc above.  
-2. Write **image_description** as if it will be sent directly to a generative image model. Use vivid, cinematic visual language that describes:
-   - The setting, mood, and lighting  
-   - Character expressions, gestures, and positions  
-   - Relevant props, backgrounds, and atmosphere  
-3. Avoid elements that generative AI renders poorly:
-   - No text, labels, symbols, or charts  
-   - No diagrams, models, mockups, graphs, or technical visualizations
-   - No complex abstractions (e.g., metaphors, irony, conceptual visuals)
-   - Focus ONLY on scenes, people, environments, and objects that can be realistically photographed or illustrated
-   - Instead of mentioning character names, the focus on image generation is more on the character visual.
-4. Write **caption** as a short motivational or descriptive text that connects the visual to the story and learning objective.  
-   - Keep captions natural, concise, and meaningful.  
-
-**Learning Objective Focus:**
-- Each screen should prioritize showing the learning objective in action, not just character interactions.
-- Focus on the conceptual understanding, problem-solving, or skill demonstration related to: {key_concept}
-- Character interactions should serve to illustrate the learning objective, not be the main focus.
-
-**Storytelling Best Practices:**
-- Maintain tone consistency across all screens (same mood, pacing, and style).
-- Use human-centered details (body language, environment, emotion) to make the story relatable.  
-- End with insight or resolution that ties directly back to the learning objective.
-
-Format as JSON:
-{{
-  "screens": [
-    {{"screen_number": 1, "image_description": "", "caption": ""}},
-    {{"screen_number": 2, "image_description": "", "caption": ""}}
-  ]
-}}
-
-Example response:
-Scenario: safeChats is a fast-growing social media platform, having active users everyday around the world and users posts in multiple languages. The Trust and Safety team of safeChats wants to strengthen their content moderation system and reduce moderation costs. Currently, they use traditional sentiment analysis that flags posts as hate speech or not hate speech. Users complain about unfair flagging, and human reviewers spend extra time interpreting decisions. Their system also performs poorly in other languages. They're exploring Generative AI and LLMs because these can understand context, sarcasm, and nuance in multiple languages, explain reasoning in natural language, suggest better moderation responses, and continuously improve through feedback loops.
-Actors: No actors are needed for this scenario.
-
-A suitable response could be:
-"screens": [
-    {{
-      "screen_number": 1,
-      "image_description": "A dynamic split-screen showing a young user sitting at a café posting on safeChats from their phone, with the background illustrating global connectivity through soft glowing world map lines. On the other side, a diverse team of content moderators works in a bright office, reviewing posts on their monitors. The mood is active and global, rendered in a clean flat-vector style with warm blues and yellows.",
-      "caption": "safeChats is a fast-growing social media platform, having active users everyday around the world and users posts in multiple languages. The Trust and Safety team of safeChats wants to strengthen their content moderation system and reduce moderation costs."
-    }},
-    {{
-      "screen_number": 2,
-      "image_description": "A computer dashboard interface displaying flagged posts with only two labels visible: 'hate speech' or 'not hate speech'. The moderators observe the screen, appearing slightly puzzled by the lack of context. The visuals emphasize simplicity and monotony, showing uniform posts on the dashboard. The scene is illustrated in a cool-toned flat style to highlight technological limitation.",
-      "caption": "safeChats currently uses a traditional sentiment analysis model that flags posts as either hate speech or not hate speech."
-    }},
-    {{
-      "screen_number": 3,
-      "image_description": "Inside the moderation center, a content moderator reviews posts written in multiple languages on multiple monitors. The moderator takes handwritten notes and highlights unclear posts with sticky notes while frowning in concentration. The lighting is dimmer, symbolizing effort and cognitive load. The visual style remains flat and professional, using muted greys and blues.",
-      "caption": "While this approach helps identify harmful content in English, moderators face a serious challenge — the system provides no explanation for its decisions and cannot support the growing marketplace of the platform in multiple countries."
-    }},
-    {{
-      "screen_number": 4,
-      "image_description": "Three moderators sit together at a long desk filled with screens showing flagged posts. One moderator leans back, another rubs their forehead, and a third scrolls through endless messages. The atmosphere is tense and slightly fatigued, with soft overhead lighting. The visual emphasizes the emotional burden of unclear decisions in a realistic office setting.",
-      "caption": "Without clear reasoning and multi-language support, human reviewers must spend extra time interpreting why a post was flagged and determining whether the classification was fair or contextually accurate."
-    }},
-    {{
-      "screen_number": 5,
-      "image_description": "A conference room scene featuring the Head of Content Moderation, AI engineers, and senior leaders gathered around a digital whiteboard showing conceptual AI architecture. Laptops and holographic visuals are on the table. The lighting is bright and forward-looking, symbolizing innovation. The color palette includes optimistic shades of teal and gold.",
-      "caption": "To improve both speed and transparency, safeChats is exploring the potential of Generative AI (GenAI) and Large Language Models (LLMs)."
-    }},
-    {{
-      "screen_number": 6,
-      "image_description": "A side-by-side comparison of two digital interfaces: on the left, a basic model incorrectly flags a post for containing the word 'destroyed'; on the right, a modern AI interface shows contextual understanding, displaying a visual of balanced speech bubbles and multilingual cues. The scene conveys accuracy and intelligence, using clean, illustrative graphics without text or labels.",
-      "caption": "Unlike standard classifiers, LLMs can understand context, sarcasm, and nuance in multiple languages, explain their reasoning in natural language, and suggest better moderation responses such as rephrasing or issuing a warning."
-    }},
-    {{
-      "screen_number": 7,
-      "image_description": "A bright office with moderators smiling as they interact with a transparent, AI-assisted moderation dashboard. The central screen displays visuals of global communication and safety icons. The environment feels calm and empowered, with green and light blue hues symbolizing trust and progress.",
-      "caption": "By leveraging feedback loops and fine-tuning, safeChats aims to build a smarter, more transparent moderation system — one that empowers human moderators and keeps online conversations safe."
-    }}
-  ]
-"""
+                prompt = SCREENS_PROMPT.format_map({
+                    "num_screens": num_screens,
+                    "key_concept": project.get("key_concept", ""),
+                    "final_scenario": final_scenario,
+                    "actors_str": actors_str,
+                    "course_title": course.get("course_title", ""),
+                    "module_title": project.get("module_title", ""),
+                })
                 
-                response = client.chat.completions.create(
+                # Show each screen as soon as it is complete rather than the raw JSON
+                stream_placeholder = st.empty()
+                content = _stream_completion(
+                    client,
+                    stream_placeholder,
+                    on_update=_screen_stream_renderer(stream_placeholder),
                     model="gpt-4-1106-preview",
                     messages=[
-                        {"role": "system", "content": "You are an expert instructional designer and learning experience designer who creates short, realistic, and motivating learning scenarios for higher education and professional audiences. Each scenario should connect the key concept to real-world practice, reflect the learners' context, and feel authentic to their field. Generate screen content in valid JSON format."},
+                        {"role": "system", "content": SCREENS_SYSTEM_PROMPT},
                         {"role": "user", "content": prompt}
                     ],
                     max_tokens=2000,
-                    temperature=0.7
+                    temperature=0.7,
+                    response_format={"type": "json_object"}
                 )
                 
-                import re
-                content = response.choices[0].message.content
-                json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                if json_match:
-                    screen_data = json.loads(json_match.group())
+                # JSON mode returns a single JSON object, so the content parses as-is
+                try:
+                    screen_data = orjson.loads(content)
+                except orjson.JSONDecodeError:
+                    st.error("Failed to parse screen data")
+                else:
                     st.session_state.screen_data = screen_data
                     st.session_state.screens_need_generation = False
+                    mark_screen_data_changed()
                     _clear_sidebar_keys()
-                else:
-                    st.error("Failed to parse screen data")
             except Exception as e:
                 st.error(f"Error generating screens: {str(e)}")
                 return
     
-    # Display and edit screens
+    # Display and edit screens; the form applies all edits in one rerun on submit
+    # instead of rerunning the whole step each time a text area loses focus
+    # Keys carry the screen_data version, so replaced screens never show stale widget state
     screens = st.session_state.screen_data.get("screens", [])
+    version = st.session_state.get("screen_data_version", 0)
+
+    with st.form("screens_form"):
+        for i, screen in enumerate(screens):
+            with st.expander(f"Screen {i+1}", expanded=True):
+                st.text_area(f"Caption", value=screen.get("caption", ""), key=f"screen_{version}_{i}_caption", height=80)
+                st.text_area(f"Image Description", value=screen.get("image_description", ""), key=f"screen_{version}_{i}_img", height=100)
+
+        # Edits are copied into the screen data once, when the form is submitted
+        save_clicked = st.form_submit_button("Save & Generate Images", type="primary", on_click=_apply_screen_form)
     
-    for i, screen in enumerate(screens):
-        with st.expander(f"Screen {i+1}", expanded=True):
-            caption = st.text_area(f"Caption", value=screen.get("caption", ""), key=f"screen_{i}_caption", height=80)
-            image_desc = st.text_area(f"Image Description", value=screen.get("image_description", ""), key=f"screen_{i}_img", height=100)
-            screens[i]["caption"] = caption
-            screens[i]["image_description"] = image_desc
+    if save_clicked:
+        try:
+            # Save to file
+            screens_filepath = _project_paths()["screens"]
+            save_scenario_data(st.session_state.screen_data, screens_filepath)
+            st.session_state._screens_dirty = False
+
+            _clear_sidebar_keys()
+            st.success("Screens saved successfully!")
+            st.session_state.current_step = 6
+            st.rerun()
+        except Exception as e:
+            st.error(f"Error saving screens: {str(e)}")
     
     # Navigation
     st.markdown("---")
-    col1, col2, col3 = st.columns(3)
+    col1, col2 = st.columns(2)
     
     with col1:
         if st.button("← Back to Metadata", type="secondary"):
@@ -1295,26 +1798,6 @@ A suitable response could be:
             st.rerun()
     
     with col2:
-        if st.button("Save & Generate Images", type="primary"):
-            try:
-                # Save to file
-                course_title = st.session_state.form_data["course"].get("course_title", "")
-                module_title = st.session_state.form_data["project"].get("module_title", "")
-                course_name = "".join(c for c in course_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-                module_name = "".join(c for c in module_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-                screens_filepath = f"data/{course_name}/{module_name}/text_outputs/screens.json"
-                os.makedirs(os.path.dirname(screens_filepath), exist_ok=True)
-                with open(screens_filepath, 'w') as f:
-                    json.dump(st.session_state.screen_data, f, indent=2)
-                
-                _clear_sidebar_keys()
-                st.success("Screens saved successfully!")
-                st.session_state.current_step = 6
-                st.rerun()
-            except Exception as e:
-                st.error(f"Error saving screens: {str(e)}")
-    
-    with col3:
         if st.button("Regenerate", type="secondary"):
             st.session_state.screens_need_generation = True
             st.rerun()
@@ -1322,15 +1805,15 @@ A suitable response could be:
 
 def step_image_generation():
     """Step 6: Generate Images for Each Screen"""
+    # Pick up images finished in the background since the last rerun
+    _collect_finished_images()
+
     screens = st.session_state.screen_data.get("screens", [])
     generated_images = st.session_state.get("generated_images", [])
     images_ready = (
         screens
         and len(generated_images) >= len(screens)
-        and all(
-            generated_images[i].get("image_b64")
-            for i in range(len(screens))
-        )
+        and all(_has_image(generated_images, i) for i in range(len(screens)))
     )
     if images_ready:
         if st.button("Preview Final Slideshow", key="go_to_preview", type="primary"):
@@ -1340,11 +1823,8 @@ def step_image_generation():
             st.rerun()
 
     # Initialize image generation
-    if "current_image_index" not in st.session_state:
-        st.session_state.current_image_index = 0
-    
-    if "generated_images" not in st.session_state:
-        st.session_state.generated_images = []
+    st.session_state.setdefault("current_image_index", 0)
+    st.session_state.setdefault("generated_images", [])
     
     if not screens:
         st.error("No screens found. Please go back and generate screens first.")
@@ -1380,7 +1860,12 @@ def step_image_generation():
         selected_screen = st.radio(
             "Jump to Screen",
             options=all_screen_options,
-            format_func=lambda x: f"Screen {x + 1}" + (" (Generated)" if x < len(st.session_state.generated_images) and st.session_state.generated_images[x].get("image_b64") else " (Not Generated)"),
+            format_func=lambda x: f"Screen {x + 1}" + (
+                " (Generated)" if _has_image(st.session_state.generated_images, x)
+                else " (Generating)" if x in st.session_state.get("_pending_images", {})
+                else " (Failed)" if x in st.session_state.get("_failed_images", {})
+                else " (Not Generated)"
+            ),
             index=current_idx,
             key="nav_radio_screen"
         )
@@ -1390,79 +1875,39 @@ def step_image_generation():
         st.caption(f"Current: Screen {current_idx + 1} of {len(screens)}")
     with nav_cols[1]:
         with st.expander("Tips for Editing Image Prompts", expanded=False):
-            st.markdown(
-                """
-                <style>
-
-                /* Make entire expander border teal */
-                details {
-                    # border: 2px solid #00847F !important;
-                    border-radius: 6px !important;
-                    overflow: hidden;
-                }
-
-                /* Style the expander header bar */
-                details > summary {
-                    # background-color: #00847F !important;
-                    # color: white !important;
-                    # padding: 0.75rem !important;
-                    font-weight: 600 !important;
-                    list-style: none !important;
-                }
-
-                </style>
-                """,
-                unsafe_allow_html=True
-            )
-
-            st.markdown("""
-            **Make characters feel real**
-
-            Include a mix of ages, genders, and ethnicities.
-
-            Describe people naturally and avoid stereotypes.
-
-            **Keep the visuals clear**
-
-            Mention lighting, mood, and the setting so the scene is easy to picture.
-
-            Avoid including text in images.
-
-            **Add useful context**
-
-            Describe where the scene takes place and what's happening.
-
-            Include relevant objects or details that support the learning goal.
-
-            **Avoid abstract ideas**
-
-            Stay away from metaphors or concepts that are difficult for AI to render literally.
-            """)
+            st.markdown(TIPS_EXPANDER_CSS, unsafe_allow_html=True)
+            st.markdown(IMAGE_PROMPT_TIPS)
 
     
     st.markdown("---")
     st.subheader(f"Screen {current_idx + 1} of {len(screens)}")
     
     # Allow editing before generation
-    edited_caption = st.text_area(
+    # Edits are copied into the screen data only when a text area actually changes;
+    # keys carry the screen_data version like the screens form
+    version = st.session_state.get("screen_data_version", 0)
+    caption_key = f"edit_caption_{version}_{current_idx}"
+    image_desc_key = f"edit_img_desc_{version}_{current_idx}"
+    st.text_area(
         "Caption",
         value=current_screen.get("caption", ""),
-        key=f"edit_caption_{current_idx}",
-        height=80
+        key=caption_key,
+        height=80,
+        on_change=_apply_screen_edit,
+        args=(current_idx, "caption", caption_key)
     )
     
-    edited_image_desc = st.text_area(
+    st.text_area(
         "Image Description",
         value=current_screen.get("image_description", ""),
-        key=f"edit_img_desc_{current_idx}",
-        height=150
+        key=image_desc_key,
+        height=150,
+        on_change=_apply_screen_edit,
+        args=(current_idx, "image_description", image_desc_key)
     )
     
-    screens[current_idx]["caption"] = edited_caption
-    screens[current_idx]["image_description"] = edited_image_desc
-    
     # Check if regeneration is needed
-    needs_generation = current_idx >= len(st.session_state.generated_images) or not st.session_state.generated_images[current_idx].get("image_b64")
+    needs_generation = not _has_image(st.session_state.generated_images, current_idx)
     
     # Auto-regenerate if flag is set
     auto_regenerate = st.session_state.get("regenerate_image") == current_idx
@@ -1471,68 +1916,44 @@ def step_image_generation():
         st.session_state.regenerate_image = None
     
     # Generate image if not already generated for this screen
-    if needs_generation:
-        if auto_regenerate:
-            # Auto-generate on rerun after regenerate button clicked
-            pass
-        elif not st.button("Generate Image", type="primary", use_container_width=True):
-            return
+    pending = st.session_state.get("_pending_images", {})
+    failed = st.session_state.get("_failed_images", {})
+    if needs_generation and current_idx in pending:
+        # The rest of the step stays usable; each click reruns the script, which collects finished images
+        st.info(f"🤖 Generating image {current_idx + 1} of {len(screens)}... You can edit other screens meanwhile.")
+        st.button("Check progress", use_container_width=True)
+    elif needs_generation:
+        if current_idx in failed:
+            st.error(f"Error generating image: {failed[current_idx]}")
+        indices = [current_idx] if auto_regenerate else []
+        if not auto_regenerate:
+            # Auto-generate on rerun after regenerate button clicked; otherwise wait for a button
+            remaining = [i for i in _missing_image_indices(screens) if i not in pending]
+            gen_col1, gen_col2 = st.columns(2)
+            with gen_col1:
+                generate_clicked = st.button("Generate Image", type="primary", use_container_width=True)
+            with gen_col2:
+                generate_all_clicked = st.button(
+                    f"Generate All Remaining ({len(remaining)})",
+                    type="secondary",
+                    use_container_width=True,
+                    disabled=len(remaining) < 2
+                )
+            if generate_all_clicked:
+                indices = remaining
+            elif generate_clicked:
+                indices = [current_idx]
         
-        # Generate the image
-        if True:
-            with st.spinner(f"🤖 Generating image {current_idx + 1} of {len(screens)}..."):
-                try:
-                    client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-                    
-                    visual_style = st.session_state.metadata_data.get("visual_style", "A vibrant, semi-realistic digital illustration in a modern vector art style, with soft gradients, clean lines, and cinematic lighting.")
-                    aspect_ratio = st.session_state.metadata_data.get("aspect_ratio", "16:9")
-                    
-                    actors = st.session_state.metadata_data.get("actors", [])
-                    actor_appearances = [f"{a.get('name', '')}: {a.get('appearance', '')}" for a in actors if a.get("appearance")]
-                    actor_context = f" Character appearances for consistency: {'. '.join(actor_appearances)}." if actor_appearances else ""
-                    
-                    # Include previous screen context for consistency
-                    prev_context = ""
-                    if current_idx > 0:
-                        prev_screen = screens[current_idx - 1]
-                        prev_desc = prev_screen.get("image_description", "")
-                        if prev_desc:
-                            prev_context = f" Previous screen context for visual consistency: {prev_desc}. "
-                    
-                    image_prompt = f"{edited_image_desc}{prev_context}{actor_context} Style: {visual_style}. Aspect ratio: {aspect_ratio}."
-                    
-                    response = client.images.generate(
-                        model="gpt-image-1-mini",
-                        prompt=image_prompt,
-                        size=(
-                            "1024x1024" if aspect_ratio == "1:1" 
-                            else "1536x1024" if aspect_ratio == "16:9" 
-                            else "1024x1536"
-                        ),
-                    )
-
-                    # gpt-image-1-mini returns base64 in b64_json
-                    image_b64 = response.data[0].b64_json
-
-                    # Ensure the index exists inside the session list
-                    if current_idx >= len(st.session_state.generated_images):
-                        st.session_state.generated_images.extend(
-                            [{}] * (current_idx - len(st.session_state.generated_images) + 1)
-                        )
-
-                    # Store image metadata
-                    st.session_state.generated_images[current_idx] = {
-                        "image_b64": image_b64,
-                        "accepted": False,
-                        "screen_number": current_idx + 1
-                    }
-
-                    _persist_generated_images()
-                    
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Error generating image: {str(e)}")
-                    return
+        # Start the request(s) in the background and show the pending state
+        if indices:
+            submitted = False
+            try:
+                _submit_image_generation(screens, indices)
+                submitted = True
+            except Exception as e:
+                st.error(f"Error generating image: {str(e)}")
+            if submitted:
+                st.rerun()
     
     # Display current screen image
     # st.markdown("---")
@@ -1543,35 +1964,38 @@ def step_image_generation():
     # else:
     #     st.info("Generate this screen's image to preview it here.")
 
-    all_generated = [(i, img) for i, img in enumerate(st.session_state.generated_images) if img.get("image_b64")]
-    if all_generated:
+    # Generated screens, plus a placeholder cell for each screen still in flight
+    images = st.session_state.generated_images
+    grid_indices = sorted({i for i, img in enumerate(images) if img.get("image_path")} | pending.keys())
+    if grid_indices:
         st.markdown("---")
         st.subheader("All Generated Screens")
         num_per_row = 2
 
-        for row_start in range(0, len(all_generated), num_per_row):
-            row_items = all_generated[row_start:row_start + num_per_row]
+        # By default only screens near the current one are rendered
+        if len(grid_indices) > GRID_WINDOW_SIZE:
+            show_all = st.toggle("Show all generated screens", key="show_all_grid")
+            if not show_all:
+                grid_indices = [i for i in grid_indices if abs(i - current_idx) <= GRID_WINDOW_RADIUS]
+
+        for row_start in range(0, len(grid_indices), num_per_row):
+            row_items = grid_indices[row_start:row_start + num_per_row]
             cols = st.columns(2, gap="small")
 
-            for idx, (orig_idx, img_data) in enumerate(row_items):
+            for idx, orig_idx in enumerate(row_items):
                 with cols[idx]:
                     is_current = orig_idx == current_idx
                     caption_text = screens[orig_idx].get("caption", "") if orig_idx < len(screens) else ""
-                    image_data_uri = f"data:image/png;base64,{img_data['image_b64']}"
+                    label = f"Screen {orig_idx + 1}" + (" (current)" if is_current else "")
                     
-                    img_style = "display:block; width:100%; height:auto; border-radius:18px; object-fit:cover;"
-                    if not is_current:
-                        img_style += " filter:grayscale(65%) contrast(95%); opacity:0.75;"
-
-                    st.markdown(
-                        f"""
-                        <div style="position:relative; width:100%; margin-bottom:1rem;">
-                            <img src="{image_data_uri}" style="{img_style}">
-                            {f'<div style="position:absolute; left:12px; right:12px; bottom:12px; background:rgba(255,255,255,0.94); border-radius:8px; padding:8px 12px; box-shadow:0 4px 12px rgba(0,0,0,0.2); font-size:0.75rem; line-height:1.4; color:#121212; max-height:40%; overflow:hidden;">{html.escape(caption_text)}</div>' if caption_text else ''}
-                        </div>
-                        """,
-                        unsafe_allow_html=True,
-                    )
+                    if _has_image(images, orig_idx):
+                        # Served as a media file by URL instead of a base64 data URI in the page HTML
+                        st.image(
+                            _image_bytes(images[orig_idx]),
+                            caption=f"{label}: {caption_text}" if caption_text else label
+                        )
+                    else:
+                        st.info(f"🤖 {label}: generating...")
     
     # Action buttons  
     st.markdown("---")
@@ -1585,24 +2009,14 @@ def step_image_generation():
     
     with col2:
         # Only show accept if image is generated
-        if current_idx < len(st.session_state.generated_images) and st.session_state.generated_images[current_idx].get("image_b64"):
+        if _has_image(st.session_state.generated_images, current_idx):
             if st.button("Accept & Continue" if current_idx < len(screens) - 1 else " Accept & Finish", type="primary"):
                 try:
-                    # Save screens with edits
-                    course_title = st.session_state.form_data["course"].get("course_title", "")
-                    module_title = st.session_state.form_data["project"].get("module_title", "")
-                    course_name = "".join(c for c in course_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-                    module_name = "".join(c for c in module_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-                    screens_filepath = f"data/{course_name}/{module_name}/text_outputs/screens.json"
-                    os.makedirs(os.path.dirname(screens_filepath), exist_ok=True)
-                    with open(screens_filepath, 'w') as f:
-                        json.dump(st.session_state.screen_data, f, indent=2)
-                    
-                    # Save generated images
-                    images_filepath = f"data/{course_name}/{module_name}/text_outputs/generated_images.json"
-                    os.makedirs(os.path.dirname(images_filepath), exist_ok=True)
-                    with open(images_filepath, 'w') as f:
-                        json.dump(st.session_state.generated_images, f, indent=2)
+                    # Save screens only when a caption or description was edited here
+                    if st.session_state.get("_screens_dirty"):
+                        screens_filepath = _project_paths()["screens"]
+                        save_scenario_data(st.session_state.screen_data, screens_filepath)
+                        st.session_state._screens_dirty = False
                     
                     st.session_state.generated_images[current_idx]["accepted"] = True
                     if current_idx < len(screens) - 1:
@@ -1614,11 +2028,11 @@ def step_image_generation():
                     _persist_generated_images()
     
     with col3:
-        if current_idx < len(st.session_state.generated_images) and st.session_state.generated_images[current_idx].get("image_b64"):
+        if _has_image(st.session_state.generated_images, current_idx):
             if st.button("Regenerate Image", type="secondary"):
-                st.session_state.generated_images[current_idx]["image_b64"] = None
+                # The manifest is persisted once the replacement image arrives
+                st.session_state.generated_images[current_idx]["image_path"] = None
                 st.session_state.regenerate_image = current_idx
-                _persist_generated_images()
                 st.rerun()
 
 
@@ -1633,7 +2047,7 @@ def step_final_preview():
     ready = (
         screens
         and len(images) >= len(screens)
-        and all(images[i].get("image_b64") for i in range(len(screens)))
+        and all(_has_image(images, i) for i in range(len(screens)))
     )
 
     # if not ready:
@@ -1648,10 +2062,7 @@ def step_final_preview():
 
     idx = st.session_state.preview_index
     caption = screens[idx].get("caption", "")
-    image_b64 = ""
-    if idx < len(images) and images[idx]:
-        image_b64 = images[idx].get("image_b64", "")
-    image_data_uri = f"data:image/png;base64,{image_b64}" if image_b64 else ""
+    image_entry = images[idx] if _has_image(images, idx) else None
     
     if st.session_state.get("should_save_composited", False):
         output_folder = _save_composited_images(screens, images)
@@ -1670,46 +2081,37 @@ def step_final_preview():
     col1, col2 = st.columns(2)
     
     with col1:
-        if os.path.exists(composited_folder) and os.path.isdir(composited_folder):
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for root, dirs, files in os.walk(composited_folder):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, composited_folder)
-                        zip_file.write(file_path, arcname)
-            zip_buffer.seek(0)
-            st.download_button("Download Composited Screens", zip_buffer.getvalue(), "composited_screens.zip", "application/zip")
+        try:
+            if os.path.exists(composited_folder) and os.path.isdir(composited_folder):
+                # Same cached archive builder as the sidebar; rebuilt only when a file changes
+                zip_bytes = _zip_output_dir(composited_folder, _dir_signature(composited_folder))
+                st.download_button("Download Composited Screens", zip_bytes, "composited_screens.zip", "application/zip")
+        except Exception as e:
+            print("Error downloading composited screens: ", e)
 
     with col2:
-        if os.path.exists(base_dir):
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for root, dirs, files in os.walk(base_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, base_dir)
-                        zip_file.write(file_path, arcname)
-            zip_buffer.seek(0)
-            course_title = st.session_state.form_data["course"].get("course_title", "course")
-            module_title = st.session_state.form_data["project"].get("module_title", "module")
-            folder_name = f"{course_title}_{module_title}_all_files.zip".replace(" ", "_")
-            st.download_button("Download All Files", zip_buffer.getvalue(), folder_name, "application/zip")
+        try:
+            if os.path.exists(base_dir):
+                zip_bytes = _zip_output_dir(base_dir, _dir_signature(base_dir))
+                course_title = st.session_state.form_data["course"].get("course_title", "course")
+                module_title = st.session_state.form_data["project"].get("module_title", "module")
+                folder_name = f"{course_title}_{module_title}_all_files.zip".replace(" ", "_")
+                st.download_button("Download All Files", zip_bytes, folder_name, "application/zip")
+        except Exception as e:
+            print("Error downloading all files: ", e)
 
     st.markdown(
         f"Captions and image descriptions remain available in `screens.json`. Right click and press 'Save Image As...' to save the image to your computer."
     )
     st.markdown(f"Screen {idx + 1} of {len(screens)}")
 
+    # The image is served as a media file by URL; only the caption box is sent as HTML
+    if image_entry:
+        st.image(_image_bytes(image_entry))
     st.markdown(
         f"""
-        <div style="position:relative; display:block; width:100%; max-width:960px; margin:0 auto;">
-            <img src="{image_data_uri}" style="width:100%; border-radius:18px;">
+        <div style="display:block; width:100%; max-width:960px; margin:0 auto;">
             <div style="
-                position:absolute;
-                left:24px;
-                right:24px;
-                bottom:24px;
                 background:rgba(255,255,255,0.94);
                 border-radius:14px;
                 padding:18px 22px;
@@ -1,14 +1,18 @@
 """
 UI components and styling for the AI Scenario Builder Tool.
 """
+import functools
+import io
+import zipfile
 import streamlit as st
 import os
+from config import mark_form_data_changed, mark_screen_data_changed
+from scenario_writer import save_scenario_data
 
 LOGO_PATH = os.path.join(os.path.dirname(__file__), "assets", "project-ace-ai.svg")
 
-def get_custom_css():
-    """Return custom CSS styles for the application"""
-    return """
+# Static stylesheet, built once at import
+CUSTOM_CSS = """
     <style>
         @import url('https://fonts.googleapis.com/css2?family=Open+Sans:wght@400;600;700&display=swap');
         :root {
@@ -186,28 +190,40 @@ def get_custom_css():
     """
 
 
-def display_progress():
-    """Display progress bar and current step"""
-    if st.session_state.current_step == 0:
-       return
-    elif st.session_state.current_step == 0.5:
-        return
-    else:
-        steps = [
-            "Project Setup",
-            "Review & Save",
-            "Scenario Generation",
-            "Metadata & Actors",
-            "Screen Generation",
-            "Image Generation",
-            "Final Preview",
-        ]
-        
-        current = st.session_state.current_step - 1
-        total = len(steps)
-        
-        from streamlit.components.v1 import html as st_html
-        progress_html = """
+def get_custom_css():
+    """Return custom CSS styles for the application"""
+    return CUSTOM_CSS
+
+
+# Progress tracker labels for steps 1-7
+PROGRESS_STEPS = (
+    "Project Setup",
+    "Review & Save",
+    "Scenario Generation",
+    "Metadata & Actors",
+    "Screen Generation",
+    "Image Generation",
+    "Final Preview",
+)
+
+HEADER_HTML = """
+            <div class="ace-header-text" style="text-align: center;">
+                <div class="title"><span style="color: var(--deep-black);">Ace-AI</span> <span style="color: var(--carnegie-red);">Scenario Builder</span></div>
+            </div>
+            """
+
+WELCOME_HTML = """
+        <div class="info-box">
+            Welcome! This tool will guide you through creating a complete project setup that helps you design engaging learning scenarios through narrative, visual storylines. Follow the steps below to build your customized scenario.
+        </div>
+        """
+
+
+@functools.lru_cache(maxsize=len(PROGRESS_STEPS) + 1)
+def _progress_html(current):
+    """Build the progress tracker markup for the given zero-based step index"""
+    total = len(PROGRESS_STEPS)
+    progress_html = """
         <div style="
             padding: 1rem 0 2rem 0;
             font-family: 'Open Sans', sans-serif;
@@ -220,88 +236,108 @@ def display_progress():
             ">
         """
 
-        for i in range(total):
-            is_completed = i < current
-            is_active = i == current
-
-            dot_color = "#00847F" if (is_completed or is_active) else "#d0d0d0"
-            text_color = "#00847F" if (is_completed or is_active) else "#d0d0d0"
-
-            # Line color for the segment from this step to the next
-            # Only draw if this is not the last step
-            if i < total - 1:
-                line_color = "#00847F" if is_completed else "#d0d0d0"
-                line_html = f"""
-                <div style="
-                    position: absolute;
-                    top: 10px;                /* roughly center of the dot */
-                    left: 50%;
-                    width: 100%;             /* from this center to next center */
-                    height: 2px;
-                    background: {line_color};
-                    z-index: 0;
-                "></div>
-                """
-            else:
-                line_html = ""
-
-            progress_html += f"""
-            <div style="position: relative; flex: 1; text-align: center; z-index: 1;">
-                {line_html}
-                <div style="
-                    position: relative;
-                    z-index: 1;
-                    width: 20px;
-                    height: 20px;
-                    border-radius: 50%;
-                    background: {dot_color};
-                    margin: 0 auto 0.5rem auto;
-                    border: 2px solid white;
-                    box-shadow: 0 0 0 2px {dot_color};
-                "></div>
-                <div style="
-                    font-size: 0.9rem;
-                    font-weight: {'bold' if is_active else 'normal'};
-                    color: {text_color};
-                    font-family: 'Open Sans', sans-serif;
-                ">
-                    Step {i+1}
-                </div>
-            </div>
+    for i in range(total):
+        is_completed = i < current
+        is_active = i == current
+
+        dot_color = "#00847F" if (is_completed or is_active) else "#d0d0d0"
+        text_color = "#00847F" if (is_completed or is_active) else "#d0d0d0"
+
+        # Line color for the segment from this step to the next
+        # Only draw if this is not the last step
+        if i < total - 1:
+            line_color = "#00847F" if is_completed else "#d0d0d0"
+            line_html = f"""
+            <div style="
+                position: absolute;
+                top: 10px;                /* roughly center of the dot */
+                left: 50%;
+                width: 100%;             /* from this center to next center */
+                height: 2px;
+                background: {line_color};
+                z-index: 0;
+            "></div>
             """
+        else:
+            line_html = ""
 
-        progress_html += """
+        progress_html += f"""
+        <div style="position: relative; flex: 1; text-align: center; z-index: 1;">
+            {line_html}
+            <div style="
+                position: relative;
+                z-index: 1;
+                width: 20px;
+                height: 20px;
+                border-radius: 50%;
+                background: {dot_color};
+                margin: 0 auto 0.5rem auto;
+                border: 2px solid white;
+                box-shadow: 0 0 0 2px {dot_color};
+            "></div>
+            <div style="
+                font-size: 0.9rem;
+                font-weight: {'bold' if is_active else 'normal'};
+                color: {text_color};
+                font-family: 'Open Sans', sans-serif;
+            ">
+                Step {i+1}
             </div>
         </div>
         """
 
-        st_html(progress_html, height=95)
+    progress_html += """
+        </div>
+    </div>
+    """
+
+    return progress_html
+
+
+def display_progress():
+    """Display progress bar and current step"""
+    current_step = st.session_state.current_step
+    if current_step == 0 or current_step == 0.5:
+        return
+
+    from streamlit.components.v1 import html as st_html
+    st_html(_progress_html(current_step - 1), height=95)
 
 
 def display_header():
     """Display the main header and welcome message"""
 
-    from streamlit.components.v1 import html
-
     # Centered title without logo
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        st.markdown(
-            """
-            <div class="ace-header-text" style="text-align: center;">
-                <div class="title"><span style="color: var(--deep-black);">Ace-AI</span> <span style="color: var(--carnegie-red);">Scenario Builder</span></div>
-            </div>
-            """,
-            unsafe_allow_html=True,
-        )
-    st.markdown(
-        """
-        <div class="info-box">
-            Welcome! This tool will guide you through creating a complete project setup that helps you design engaging learning scenarios through narrative, visual storylines. Follow the steps below to build your customized scenario.
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+        st.markdown(HEADER_HTML, unsafe_allow_html=True)
+    st.markdown(WELCOME_HTML, unsafe_allow_html=True)
+
+
+def _dir_signature(base_dir):
+    """Return a (relpath, mtime, size) tuple for every file under base_dir, skipping in-progress .tmp saves"""
+    signature = []
+    for root, dirs, files in os.walk(base_dir):
+        for file in files:
+            if file.endswith(".tmp"):
+                continue
+            file_path = os.path.join(root, file)
+            stat = os.stat(file_path)
+            signature.append((os.path.relpath(file_path, base_dir), stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(signature))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _zip_output_dir(base_dir, signature):
+    """
+    Zip the files listed in signature; rebuilt only when a file is added, removed or changed.
+    Kept as a shared resource so a cache hit returns the bytes without copying them.
+    """
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for arcname, _, _ in signature:
+            zip_file.write(os.path.join(base_dir, arcname), arcname)
+    return zip_buffer.getvalue()
 
 
 def display_optional_details_modal():
@@ -313,25 +349,15 @@ def display_optional_details_modal():
             
             # Download all files button
             try:
-                import zipfile
-                import io
-                import os as os_module
                 from steps import _get_text_output_dir
                 
                 base_dir = _get_text_output_dir()
-                if os_module.path.exists(base_dir):
-                    zip_buffer = io.BytesIO()
-                    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                        for root, dirs, files in os_module.walk(base_dir):
-                            for file in files:
-                                file_path = os_module.path.join(root, file)
-                                arcname = os_module.path.relpath(file_path, base_dir)
-                                zip_file.write(file_path, arcname)
-                    zip_buffer.seek(0)
+                if os.path.exists(base_dir):
+                    zip_bytes = _zip_output_dir(base_dir, _dir_signature(base_dir))
                     course_title = st.session_state.form_data["course"].get("course_title", "course")
                     module_title = st.session_state.form_data["project"].get("module_title", "module")
                     folder_name = f"{course_title}_{module_title}_all_files.zip".replace(" ", "_")
-                    st.download_button("Download All Files", zip_buffer.getvalue(), folder_name, "application/zip", use_container_width=True)
+                    st.download_button("Download All Files", zip_bytes, folder_name, "application/zip", use_container_width=True)
             except Exception as e:
                 print("Error downloading all files: ", e)
                 pass
@@ -351,78 +377,81 @@ def display_optional_details_modal():
             st.text_input("Course", value=course_title_display, key="sidebar_course_display", disabled=True, label_visibility="visible")
             st.text_input("Module", value=module_title_display, key="sidebar_module_display", disabled=True, label_visibility="visible")
             
-            # Required Information Section
-            with st.expander("Required Information", expanded=False):
-
-                professional_domain = st.text_input(
-                    "What is the learner's professional domain?",
-                    value=st.session_state.form_data["audience"].get("professional_domain", ""),
-                    help="This helps shape the tone and professional context of the scenario.",
-                    key="modal_professional_domain",
-                    placeholder="e.g., Marketing professionals, Social media managers, Data analysts"
-                )
+            # Batch detail edits into a single rerun on submit
+            with st.form("sidebar_details_form"):
+                # Required Information Section
+                with st.expander("Required Information", expanded=False):
+
+                    professional_domain = st.text_input(
+                        "What is the learner's professional domain?",
+                        value=st.session_state.form_data["audience"].get("professional_domain", ""),
+                        help="This helps shape the tone and professional context of the scenario.",
+                        key="modal_professional_domain",
+                        placeholder="e.g., Marketing professionals, Social media managers, Data analysts"
+                    )
                 
-                course_description = st.text_area(
-                    "What is a high-level course description?",
-                    value=st.session_state.form_data["course"].get("course_description", ""),
-                    help="Provide context about what the course covers overall.",
-                    height=100,
-                    key="modal_course_description",
-                    placeholder="e.g., This course teaches students how to use AI tools..."
-                )
+                    course_description = st.text_area(
+                        "What is a high-level course description?",
+                        value=st.session_state.form_data["course"].get("course_description", ""),
+                        help="Provide context about what the course covers overall.",
+                        height=100,
+                        key="modal_course_description",
+                        placeholder="e.g., This course teaches students how to use AI tools..."
+                    )
 
-                key_concept = st.text_area(
-                    "What is the key concept or learning objective that the scenario should highlight?",
-                    value=st.session_state.form_data["project"].get("key_concept", ""),
-                    help="This becomes the main idea or concept the scenario brings to life.",
-                    height=100,
-                    key="modal_key_concept",
-                    placeholder="List one or two key ideas, e.g., analyzing information to make a decision"
-                )
+                    key_concept = st.text_area(
+                        "What is the key concept or learning objective that the scenario should highlight?",
+                        value=st.session_state.form_data["project"].get("key_concept", ""),
+                        help="This becomes the main idea or concept the scenario brings to life.",
+                        height=100,
+                        key="modal_key_concept",
+                        placeholder="List one or two key ideas, e.g., analyzing information to make a decision"
+                    )
             
-                existing_challenge = st.text_area(
-                    "What do the learners already know about this topic?",
-                    value=st.session_state.form_data["project"].get("existing_challenge", ""),
-                    help="This helps set the right level of challenge.",
+                    existing_challenge = st.text_area(
+                        "What do the learners already know about this topic?",
+                        value=st.session_state.form_data["project"].get("existing_challenge", ""),
+                        help="This helps set the right level of challenge.",
+                        height=100,
+                        key="modal_existing_challenge",
+                        placeholder="Mention what learners already understand, e.g., they know basic tools"
+                    )
+
+                additional_info_value = st.session_state.form_data.get("additional_info", "")
+                if not isinstance(additional_info_value, str):
+                    additional_info_value = ""
+                additional_info = st.text_area(
+                    "Additional Information",
+                    value=additional_info_value,
+                    help="Additional information about the project",
                     height=100,
-                    key="modal_existing_challenge",
-                    placeholder="Mention what learners already understand, e.g., they know basic tools"
+                    key="optional_additional_info"
                 )
-            
-            additional_info_value = st.session_state.form_data.get("additional_info", "")
-            if not isinstance(additional_info_value, str):
-                additional_info_value = ""
-            additional_info = st.text_area(
-                "Additional Information",
-                value=additional_info_value,
-                help="Additional information about the project",
-                height=100,
-                key="optional_additional_info"
-            )
         
-            st.markdown("")
-            if st.button("Save All Details", type="primary", use_container_width=True):
-                course_title = st.session_state.form_data["course"].get("course_title", "")
-                module_title = st.session_state.form_data["project"].get("module_title", "")
-                if not course_title or not professional_domain or not course_description or not module_title or not key_concept or not existing_challenge:
-                    st.error("All required fields must be filled.")
-                else:
-                    st.session_state.form_data["course"]["course_title"] = course_title
-                    st.session_state.form_data["course"]["course_description"] = course_description
-                    st.session_state.form_data["project"]["module_title"] = module_title
-                    st.session_state.form_data["project"]["key_concept"] = key_concept
-                    st.session_state.form_data["project"]["existing_challenge"] = existing_challenge
-                    st.session_state.form_data["audience"]["professional_domain"] = professional_domain
-                    st.session_state.form_data["additional_info"] = additional_info
+                st.markdown("")
+                if st.form_submit_button("Save All Details", type="primary", use_container_width=True):
+                    course_title = st.session_state.form_data["course"].get("course_title", "")
+                    module_title = st.session_state.form_data["project"].get("module_title", "")
+                    if not course_title or not professional_domain or not course_description or not module_title or not key_concept or not existing_challenge:
+                        st.error("All required fields must be filled.")
+                    else:
+                        st.session_state.form_data["course"]["course_title"] = course_title
+                        st.session_state.form_data["course"]["course_description"] = course_description
+                        st.session_state.form_data["project"]["module_title"] = module_title
+                        st.session_state.form_data["project"]["key_concept"] = key_concept
+                        st.session_state.form_data["project"]["existing_challenge"] = existing_challenge
+                        st.session_state.form_data["audience"]["professional_domain"] = professional_domain
+                        st.session_state.form_data["additional_info"] = additional_info
+                        mark_form_data_changed()
                     
-                    # Save to JSON file
-                    try:
-                        from utils import save_to_json
-                        filepath = save_to_json()
-                        st.success(f"Details saved to {filepath}!")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Error saving details: {str(e)}")
+                        # Save to JSON file
+                        try:
+                            from utils import save_to_json
+                            filepath = save_to_json()
+                            st.success(f"Details saved to {filepath}!")
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"Error saving details: {str(e)}")
 
             # Show final scenario for step 4+
             if st.session_state.current_step >= 4:
@@ -440,21 +469,13 @@ def display_optional_details_modal():
                 if st.button("Update Scenario", use_container_width=True):
                     try:
                         st.session_state.scenario_data["final_scenario"] = updated_scenario
-                        from steps import _clear_sidebar_keys
+                        from steps import _clear_sidebar_keys, _project_paths
                         _clear_sidebar_keys()
                         
                         # Save to scenario_descriptions.json
-                        course_title = st.session_state.form_data["course"].get("course_title", "")
-                        module_title = st.session_state.form_data["project"].get("module_title", "")
-                        course_name = "".join(c for c in course_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-                        module_name = "".join(c for c in module_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-                        desc_filepath = f"data/{course_name}/{module_name}/text_outputs/scenario_descriptions.json"
+                        desc_filepath = _project_paths()["scenario"]
                         
-                        import os
-                        os.makedirs(os.path.dirname(desc_filepath), exist_ok=True)
-                        import json
-                        with open(desc_filepath, 'w') as f:
-                            json.dump({"scenario_description": updated_scenario}, f, indent=2)
+                        save_scenario_data({"scenario_description": updated_scenario}, desc_filepath)
                         
                         st.success("Scenario updated!")
                         st.rerun()
@@ -470,72 +491,65 @@ def display_optional_details_modal():
                     with st.expander("Metadata & Actors"):
                         metadata = st.session_state.get("metadata_data", {})
                         if metadata:
-                            num_screens = st.number_input("Number of Screens", value=metadata.get("num_screens", 5), key="sidebar_num_screens", min_value=1, max_value=20)
-                            aspect_ratio = st.text_input("Aspect Ratio", value=metadata.get("aspect_ratio", "16:9"), key="sidebar_aspect_ratio")
-                            visual_style = st.text_input("Visual Style", value=metadata.get("visual_style", "A vibrant, semi-realistic digital illustration in a modern vector art style, with soft gradients, clean lines, and cinematic lighting."), key="sidebar_visual_style")
+                            with st.form("sidebar_metadata_form"):
+                                num_screens = st.number_input("Number of Screens", value=metadata.get("num_screens", 5), key="sidebar_num_screens", min_value=1, max_value=20)
+                                aspect_ratio = st.text_input("Aspect Ratio", value=metadata.get("aspect_ratio", "16:9"), key="sidebar_aspect_ratio")
+                                visual_style = st.text_input("Visual Style", value=metadata.get("visual_style", "A vibrant, semi-realistic digital illustration in a modern vector art style, with soft gradients, clean lines, and cinematic lighting."), key="sidebar_visual_style")
                             
-                            actors = metadata.get("actors", [])
-                            st.markdown("**Actors:**")
-                            for i, actor in enumerate(actors):
-                                st.markdown(f"**Actor {i+1}: {actor.get('name', '')}**")
-                                st.text_input(
-                                    "Name",
-                                    value=actor.get("name", ""),
-                                    key=f"sidebar_actor_{i}_name"
-                                )
-                                st.text_input(
-                                    "Role",
-                                    value=actor.get("role", ""),
-                                    key=f"sidebar_actor_{i}_role"
-                                )
-                                st.text_area(
-                                    "Purpose",
-                                    value=actor.get("purpose", ""),
-                                    key=f"sidebar_actor_{i}_purpose",
-                                    height=80
-                                )
-                                st.text_area(
-                                    "Appearance",
-                                    value=actor.get("appearance", ""),
-                                    key=f"sidebar_actor_{i}_appearance",
-                                    height=80
-                                )
-                                st.markdown("---")
+                                actors = metadata.get("actors", [])
+                                st.markdown("**Actors:**")
+                                for i, actor in enumerate(actors):
+                                    st.markdown(f"**Actor {i+1}: {actor.get('name', '')}**")
+                                    st.text_input(
+                                        "Name",
+                                        value=actor.get("name", ""),
+                                        key=f"sidebar_actor_{i}_name"
+                                    )
+                                    st.text_input(
+                                        "Role",
+                                        value=actor.get("role", ""),
+                                        key=f"sidebar_actor_{i}_role"
+                                    )
+                                    st.text_area(
+                                        "Purpose",
+                                        value=actor.get("purpose", ""),
+                                        key=f"sidebar_actor_{i}_purpose",
+                                        height=80
+                                    )
+                                    st.text_area(
+                                        "Appearance",
+                                        value=actor.get("appearance", ""),
+                                        key=f"sidebar_actor_{i}_appearance",
+                                        height=80
+                                    )
+                                    st.markdown("---")
 
-                            if st.button("Update Metadata & Actors", use_container_width=True):
-                                try:
-                                    actors_data = []
-                                    for i in range(len(actors)):
-                                        actors_data.append({
-                                            "name": st.session_state[f"sidebar_actor_{i}_name"],
-                                            "role": st.session_state[f"sidebar_actor_{i}_role"],
-                                            "purpose": st.session_state[f"sidebar_actor_{i}_purpose"],
-                                            "appearance": st.session_state.get(f"sidebar_actor_{i}_appearance", "")
+                                if st.form_submit_button("Update Metadata & Actors", use_container_width=True):
+                                    try:
+                                        actors_data = []
+                                        for i in range(len(actors)):
+                                            actors_data.append({
+                                                "name": st.session_state[f"sidebar_actor_{i}_name"],
+                                                "role": st.session_state[f"sidebar_actor_{i}_role"],
+                                                "purpose": st.session_state[f"sidebar_actor_{i}_purpose"],
+                                                "appearance": st.session_state.get(f"sidebar_actor_{i}_appearance", "")
+                                            })
+                                        st.session_state.metadata_data.update({
+                                            "num_screens": num_screens,
+                                            "aspect_ratio": aspect_ratio,
+                                            "visual_style": visual_style,
+                                            "actors": actors_data
                                         })
-                                    st.session_state.metadata_data.update({
-                                        "num_screens": num_screens,
-                                        "aspect_ratio": aspect_ratio,
-                                        "visual_style": visual_style,
-                                        "actors": actors_data
-                                    })
-                                    from steps import _clear_sidebar_keys
-                                    _clear_sidebar_keys()
+                                        from steps import _clear_sidebar_keys, _project_paths
+                                        _clear_sidebar_keys()
                                     
-                                    course_title = st.session_state.form_data["course"].get("course_title", "")
-                                    module_title = st.session_state.form_data["project"].get("module_title", "")
-                                    course_name = "".join(c for c in course_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-                                    module_name = "".join(c for c in module_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-                                    metadata_filepath = f"data/{course_name}/{module_name}/text_outputs/scenario_metadata.json"
-                                    import os
-                                    os.makedirs(os.path.dirname(metadata_filepath), exist_ok=True)
-                                    import json
-                                    with open(metadata_filepath, 'w') as f:
-                                        json.dump(st.session_state.metadata_data, f, indent=2)
+                                        metadata_filepath = _project_paths()["metadata"]
+                                        save_scenario_data(st.session_state.metadata_data, metadata_filepath)
                                     
-                                    st.success("Updated!")
-                                    st.rerun()
-                                except Exception as e:
-                                    st.error(f"Error: {str(e)}")
+                                        st.success("Updated!")
+                                        st.rerun()
+                                    except Exception as e:
+                                        st.error(f"Error: {str(e)}")
                 
                 # Show screens for step 6+
                 if st.session_state.current_step >= 6:
@@ -552,18 +566,11 @@ def display_optional_details_modal():
                                 if st.button(f"Update Screen {i+1}", key=f"update_screen_{i}", use_container_width=True):
                                     screens[i]["caption"] = caption
                                     screens[i]["image_description"] = img_desc
-                                    course_title = st.session_state.form_data["course"].get("course_title", "")
-                                    module_title = st.session_state.form_data["project"].get("module_title", "")
-                                    course_name = "".join(c for c in course_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-                                    module_name = "".join(c for c in module_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-                                    screens_filepath = f"data/{course_name}/{module_name}/text_outputs/screens.json"
-                                    import os
-                                    os.makedirs(os.path.dirname(screens_filepath), exist_ok=True)
-                                    import json
-                                    with open(screens_filepath, 'w') as f:
-                                        json.dump({"screens": screens}, f, indent=2)
+                                    from steps import _clear_sidebar_keys, _project_paths
+                                    screens_filepath = _project_paths()["screens"]
+                                    save_scenario_data({"screens": screens}, screens_filepath)
                                     st.session_state.screen_data = {"screens": screens}
-                                    from steps import _clear_sidebar_keys
+                                    mark_screen_data_changed()
                                     _clear_sidebar_keys()
                                     st.rerun()
                                 st.markdown("---")
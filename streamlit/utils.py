@@ -1,9 +1,9 @@
 """
 Utility functions for the AI Scenario Builder Tool.
 """
-import json
 import os
 import streamlit as st
+from scenario_writer import clean_name, save_scenario_data
 
 
 def save_to_json():
@@ -13,8 +13,8 @@ def save_to_json():
     module_title = st.session_state.form_data["project"].get("module_title", "unknown_module")
     
     # Clean names for directory structure (remove spaces, special characters)
-    course_name = "".join(c for c in course_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
-    module_name = "".join(c for c in module_title if c.isalnum() or c in (' ', '-', '_')).rstrip().replace(' ', '_')
+    course_name = clean_name(course_title)
+    module_name = clean_name(module_title)
     
     # Create directory structure
     base_path = "data"
@@ -22,40 +22,60 @@ def save_to_json():
     module_path = os.path.join(course_path, module_name)
     text_outputs_path = os.path.join(module_path, "text_outputs")
     
-    # Create directories if they don't exist
-    os.makedirs(text_outputs_path, exist_ok=True)
-    
-    # Save JSON file
+    # Save JSON file; directories are created as needed
     filename = "context.json"
     filepath = os.path.join(text_outputs_path, filename)
     
-    with open(filepath, 'w') as f:
-        json.dump(st.session_state.form_data, f, indent=2)
+    save_scenario_data(st.session_state.form_data, filepath)
+
+    # A new course or module may now exist on disk
+    clear_existing_content_cache()
     
     return filepath
 
 
+def clear_existing_content_cache():
+    """Drop the cached course and module listing so the next call rescans the data directory"""
+    get_course_module_map.clear()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_course_module_map():
+    """
+    Map each existing course to its modules, read in a single pass over the data directory.
+    Both levels use display names; each module maps to its directory path.
+    """
+    course_modules = {}
+    try:
+        with os.scandir("data") as courses:
+            for course in courses:
+                if course.is_dir():
+                    with os.scandir(course.path) as modules:
+                        module_paths = {_display_name(module.name): module.path for module in modules if module.is_dir()}
+                    course_modules[_display_name(course.name)] = dict(sorted(module_paths.items()))
+    except FileNotFoundError:
+        pass
+    return dict(sorted(course_modules.items()))
+
+
+def _display_name(dir_name):
+    return dir_name.replace('_', ' ').title()
+
+
 def get_existing_courses():
     """Get list of existing courses from data directory"""
-    courses = []
-    data_path = "data"
-    if os.path.exists(data_path):
-        for item in os.listdir(data_path):
-            item_path = os.path.join(data_path, item)
-            if os.path.isdir(item_path):
-                courses.append(item.replace('_', ' ').title())
-    return sorted(courses)
+    return list(get_course_module_map())
 
 
 def get_existing_modules(course_name):
     """Get list of existing modules for a given course"""
-    modules = []
-    course_name_clean = course_name.lower().replace(' ', '_')
-    course_path = os.path.join("data", course_name_clean)
-    
-    if os.path.exists(course_path):
-        for item in os.listdir(course_path):
-            item_path = os.path.join(course_path, item)
-            if os.path.isdir(item_path):
-                modules.append(item.replace('_', ' ').title())
-    return sorted(modules)
+    return list(get_course_module_map().get(course_name, {}))
+
+
+def get_module_path(course_name, module_name):
+    """
+    Directory of an existing module, given the display names shown in the selection lists.
+    Display names are title-cased, so the real directory is looked up rather than re-derived.
+    """
+    module_path = get_course_module_map().get(course_name, {}).get(module_name)
+    return module_path or os.path.join("data", clean_name(course_name), clean_name(module_name))